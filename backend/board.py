@@ -1,97 +1,104 @@
-import random
+import time
+
+import numpy as np
+from . import metrics
+from .neighbors import DEFAULT_NEIGHBORS, get_neighbor_index
+from .utils import compute_adjacent_counts
 
 class MinesweeperBoard:
-    DEFAULT_NEIGHBORS = [
-        (-1, -1), (-1, 0), (-1, 1),
-        (0, -1),          (0, 1),
-        (1, -1), (1, 0), (1, 1)
-    ]
+    DEFAULT_NEIGHBORS = DEFAULT_NEIGHBORS
 
-    def __init__(self, width, height, num_mines, seed=None, custom_mask=None):
+    def __init__(self, width, height, num_mines, seed=None, custom_mask=None, mine_layout=None, board_values=None):
         self.width = width
         self.height = height
         self.num_mines = num_mines
         self.seed = seed
         self.custom_mask = custom_mask if custom_mask is not None else self.DEFAULT_NEIGHBORS
-
-        self.board = []         # -1 = mine, 0-8 = adjacent mine counts
-        self.revealed = []      # bool grid
-        self.flags = []         # bool grid
+        self.neighbor_index = get_neighbor_index(width, height, self.custom_mask)
+        self.mine_layout = mine_layout  # optional flat (row * width + col) mine indices, used instead of sampling
+        self.board_values = board_values  # optional precomputed board (e.g. from a BoardBank), used as is
+
+        self.board = None       # int8 grid: -1 = mine, 0-8 = adjacent mine counts
+        self.revealed = None    # bool grid
+        self.flags = None       # bool grid
+        self.last_revealed = [] # cells opened by the most recent reveal
+
+        # Running counters, updated as cells change so queries are O(1)
+        self.revealed_count = 0     # all revealed cells, including an exploded mine
+        self.safe_revealed = 0      # revealed non-mine cells
+        self.num_flags = 0
+        self.correct_flags = 0      # flags on mines
+        self.incorrect_flags = 0    # flags on non-mines
 
         self._init_board()
 
     def _init_board(self):
-        if self.seed is not None:
-            random.seed(self.seed)
+        self.revealed = np.zeros((self.height, self.width), dtype=bool)
+        self.flags = np.zeros((self.height, self.width), dtype=bool)
 
-        self.board = [[0 for _ in range(self.width)] for _ in range(self.height)]
-        self.revealed = [[False for _ in range(self.width)] for _ in range(self.height)]
-        self.flags = [[False for _ in range(self.width)] for _ in range(self.height)]
+        if self.board_values is not None:
+            self.board = np.array(self.board_values, dtype=np.int8)
+            return
 
+        self.board = np.zeros((self.height, self.width), dtype=np.int8)
         self._place_mines()
         self._compute_adjacent_counts()
 
     def _place_mines(self):
-        all_coords = [(r, c) for r in range(self.height) for c in range(self.width)]
-        mine_coords = random.sample(all_coords, self.num_mines)
-
-        for r, c in mine_coords:
-            self.board[r][c] = -1
+        if self.mine_layout is not None:
+            mine_indices = np.asarray(self.mine_layout, dtype=np.intp)
+        else:
+            rng = np.random.default_rng(self.seed)
+            mine_indices = rng.choice(self.width * self.height, size=self.num_mines, replace=False)
+        self.board.flat[mine_indices] = -1
+
+    def get_mine_layout(self):
+        """
+        Return the flat (row * width + col) indices of all mines.
+        """
+        return np.flatnonzero(self.board == -1).tolist()
 
     def _compute_adjacent_counts(self):
-        for r in range(self.height):
-            for c in range(self.width):
-                if self.board[r][c] == -1:
-                    continue
-                count = 0
-                for dr, dc in self.custom_mask:
-                    nr, nc = r + dr, c + dc
-                    if self.is_valid_coord(nr, nc) and self.board[nr][nc] == -1:
-                        count += 1
-                self.board[r][c] = count
+        self.board = compute_adjacent_counts(self.board == -1, self.custom_mask)
 
     def is_valid_coord(self, row, col):
         return 0 <= row < self.height and 0 <= col < self.width
 
-    def reveal(self, row, col):
-        if not self.is_valid_coord(row, col) or self.revealed[row][col] or self.flags[row][col]:
-            return False
-
-        self.revealed[row][col] = True
-        if self.board[row][col] == 0:
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    nr, nc = row + dr, col + dc
-                    if (dr != 0 or dc != 0) and self.is_valid_coord(nr, nc):
-                        self.reveal(nr, nc)
-        return self.board[row][col] == -1
-
     def flag(self, row, col):
-        if self.is_valid_coord(row, col) and not self.revealed[row][col]:
-            self.flags[row][col] = not self.flags[row][col]
+        if self.is_valid_coord(row, col) and not self.revealed[row, col]:
+            flagged = not self.flags[row, col]
+            self.flags[row, col] = flagged
+
+            delta = 1 if flagged else -1
+            self.num_flags += delta
+            if self.board[row, col] == -1:
+                self.correct_flags += delta
+            else:
+                self.incorrect_flags += delta
 
     def is_mine(self, row, col):
-        return self.is_valid_coord(row, col) and self.board[row][col] == -1
+        return self.is_valid_coord(row, col) and bool(self.board[row, col] == -1)
 
     def is_revealed(self, row, col):
-        return self.is_valid_coord(row, col) and self.revealed[row][col]
+        return self.is_valid_coord(row, col) and bool(self.revealed[row, col])
 
     def is_flagged(self, row, col):
-        return self.is_valid_coord(row, col) and self.flags[row][col]
+        return self.is_valid_coord(row, col) and bool(self.flags[row, col])
 
     def is_complete(self):
-        for r in range(self.height):
-            for c in range(self.width):
-                if self.board[r][c] != -1 and not self.revealed[r][c]:
-                    return False
-        return True
+        return self.safe_revealed == self.width * self.height - self.num_mines
 
     def get_visible_state(self, game_over_flag=False, game_won_flag=False):
+        # Work on plain lists so the returned cells are JSON-safe Python ints
+        board = self.board.tolist()
+        revealed = self.revealed.tolist()
+        flags = self.flags.tolist()
+
         state = []
         for r in range(self.height):
             row_cells = []
             for c in range(self.width):
-                is_mine_cell = (self.board[r][c] == -1)
+                is_mine_cell = (board[r][c] == -1)
 
                 if game_over_flag:
                     if is_mine_cell:
@@ -99,28 +106,28 @@ class MinesweeperBoard:
                             # Game won, all mines are effectively "flagged"
                             row_cells.append("F")
                         else: # Game lost
-                            if self.revealed[r][c] and self.board[r][c] == -1: # This is the mine that was clicked
+                            if revealed[r][c] and board[r][c] == -1: # This is the mine that was clicked
                                 row_cells.append("*") # Exploded mine
-                            elif self.flags[r][c]: # Correctly flagged mine
+                            elif flags[r][c]: # Correctly flagged mine
                                 row_cells.append("F")
                             else: # Other unflagged, unrevealed mines
                                 row_cells.append("M")
                     else: # Not a mine
-                        if self.flags[r][c]: # Incorrectly flagged non-mine
+                        if flags[r][c]: # Incorrectly flagged non-mine
                             row_cells.append("X")
-                        elif self.revealed[r][c]:
-                            row_cells.append(self.board[r][c])
+                        elif revealed[r][c]:
+                            row_cells.append(board[r][c])
                         else:
                             # Unrevealed non-mine cell in a game over state (loss)
                             # Show as None (still hidden) or could show its number
                             row_cells.append(None)
                 else:
-                    if self.flags[r][c]:
+                    if flags[r][c]:
                         row_cells.append("F")
-                    elif not self.revealed[r][c]:
+                    elif not revealed[r][c]:
                         row_cells.append(None)
                     else:
-                        row_cells.append(self.board[r][c])
+                        row_cells.append(board[r][c])
             state.append(row_cells)
         return state
 
@@ -135,51 +142,72 @@ class MinesweeperBoard:
             print(row)
 
     def reveal(self, row: int, col: int) -> bool:
+        """
+        Reveal (row, col), or chord it if it is an already revealed number whose
+        flagged neighbours match its count. Returns True if a mine was uncovered.
+        The cells opened by this call are kept in self.last_revealed.
+        """
+        start = time.perf_counter() if metrics.enabled else None
+        self.last_revealed = self.reveal_cells(row, col)
+        hit_mine = any(self.board[r, c] == -1 for r, c in self.last_revealed)
+        if start is not None:
+            metrics.record_reveal(len(self.last_revealed), time.perf_counter() - start)
+        return hit_mine
+
+    def reveal_cells(self, row: int, col: int) -> list[tuple[int, int]]:
+        """
+        Apply a reveal at (row, col) and return the list of newly revealed cells.
+        """
         if not self.is_valid_coord(row, col):
-            return False
+            return []
 
         # CASE 1: normal reveal (if not yet revealed and not flagged)
-        if not self.revealed[row][col] and not self.flags[row][col]:
-            self.revealed[row][col] = True
-            
-            # Check if the current cell itself is a mine
-            if self.board[row][col] == -1:
-                return True # Current cell is a mine
-
-            # If it's a '0', flood fill. Accumulate mine_hit status from recursive calls.
-            if self.board[row][col] == 0:
-                mine_hit_during_flood_fill = False
-                # Use the custom_mask for 0-reveal flood fill
-                # because the '0' was determined by the custom_mask.
-                for dr, dc in self.custom_mask: 
-                    nr, nc = row + dr, col + dc
-                    if self.is_valid_coord(nr, nc):
-                        if self.reveal(nr, nc): 
-                            mine_hit_during_flood_fill = True
-                return mine_hit_during_flood_fill
-
-            # If it's a number (1-8), it's revealed, no mine hit by this specific action.
-            return False
+        if not self.revealed[row, col] and not self.flags[row, col]:
+            return self._flood_reveal([(row, col)])
 
         # CASE 2: mass reveal (if already revealed and is a number > 0)
-        if self.revealed[row][col] and self.board[row][col] > 0:
+        if self.revealed[row, col] and self.board[row, col] > 0:
             flagged = 0
             to_reveal = []
-            
-            for dr, dc in self.custom_mask:
-                nr, nc = row + dr, col + dc
-                if self.is_valid_coord(nr, nc):
-                    if self.flags[nr][nc]:
-                        flagged += 1
-                    elif not self.revealed[nr][nc]: 
-                        to_reveal.append((nr, nc))
-            
-            if flagged == self.board[row][col]:
-                mine_hit_on_mass_reveal = False
-                for nr, nc in to_reveal:
-                    if self.reveal(nr, nc):
-                        mine_hit_on_mass_reveal = True
-                return mine_hit_on_mass_reveal
-        
-        # If action is invalid (e.g. revealing flagged cell, or already revealed cell not leading to mass reveal)
-        return False
\ No newline at end of file
+            for nr, nc in self.neighbor_index.neighbors(row, col):
+                if self.flags[nr, nc]:
+                    flagged += 1
+                elif not self.revealed[nr, nc]:
+                    to_reveal.append((nr, nc))
+
+            if flagged == self.board[row, col]:
+                return self._flood_reveal(to_reveal)
+
+        # Invalid action (e.g. revealing a flagged cell, or a revealed cell that cannot be chorded)
+        return []
+
+    def _flood_reveal(self, start_cells):
+        """
+        Reveal start_cells and open every zero region reachable from them with an
+        explicit stack. Cells are marked revealed when pushed so each is visited once.
+        """
+        newly_revealed = []
+        stack = []
+        mines_hit = 0
+        for r, c in start_cells:
+            if not self.revealed[r, c] and not self.flags[r, c]:
+                self.revealed[r, c] = True
+                newly_revealed.append((r, c))
+                stack.append((r, c))
+                if self.board[r, c] == -1:
+                    mines_hit += 1
+
+        while stack:
+            r, c = stack.pop()
+            # Zeros are counted with custom_mask, so their mask neighbours are never mines
+            if self.board[r, c] != 0:
+                continue
+            for nr, nc in self.neighbor_index.neighbors(r, c):
+                if not self.revealed[nr, nc] and not self.flags[nr, nc]:
+                    self.revealed[nr, nc] = True
+                    newly_revealed.append((nr, nc))
+                    stack.append((nr, nc))
+
+        self.revealed_count += len(newly_revealed)
+        self.safe_revealed += len(newly_revealed) - mines_hit
+        return newly_revealed
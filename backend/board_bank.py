@@ -0,0 +1,111 @@
+# backend/board_bank.py
+
+import json
+import os
+from typing import List, Tuple
+
+import numpy as np
+from .board import MinesweeperBoard
+from .utils import compute_adjacent_counts
+
+
+def _metadata_path(path: str) -> str:
+    return path + ".json"
+
+
+def generate_board_bank(path: str, width: int, height: int, num_mines: int, count: int,
+                        custom_mask: List[Tuple[int, int]] = None, seed: int = None, chunk_size: int = 10000):
+    """
+    Pregenerate `count` boards into a .npy file of shape (count, height, width) holding
+    the int8 board values (-1 for mines, otherwise adjacent counts), plus a JSON
+    sidecar with the board parameters. Boards are generated in vectorized chunks.
+    """
+    custom_mask = MinesweeperBoard.DEFAULT_NEIGHBORS if custom_mask is None else custom_mask
+    num_cells = width * height
+    rng = np.random.default_rng(seed)
+
+    bank = np.lib.format.open_memmap(path, mode="w+", dtype=np.int8, shape=(count, height, width))
+    for start in range(0, count, chunk_size):
+        n = min(chunk_size, count - start)
+        mines = np.zeros((n, num_cells), dtype=bool)
+        if num_mines:
+            # The num_mines smallest of num_cells uniform keys give a uniform sample without replacement
+            keys = rng.random((n, num_cells))
+            np.put_along_axis(mines, np.argpartition(keys, num_mines - 1, axis=1)[:, :num_mines], True, axis=1)
+        bank[start:start + n] = compute_adjacent_counts(mines.reshape(n, height, width), custom_mask)
+    bank.flush()
+    del bank
+
+    with open(_metadata_path(path), "w") as f:
+        json.dump({
+            "width": width,
+            "height": height,
+            "num_mines": num_mines,
+            "custom_mask": [list(offset) for offset in custom_mask],
+            "count": count,
+            "seed": seed
+        }, f, indent=2)
+
+
+class BoardBank:
+    """
+    Read-only, memory-mapped view of a bank written by generate_board_bank.
+
+    Boards are looked up by index in O(1) without recomputing counts. The file is
+    mapped rather than loaded, so processes opening the same bank share its pages;
+    pickling a BoardBank only sends its path.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(_metadata_path(path)) as f:
+            metadata = json.load(f)
+        self.width = metadata["width"]
+        self.height = metadata["height"]
+        self.num_mines = metadata["num_mines"]
+        self.custom_mask = [tuple(offset) for offset in metadata["custom_mask"]]
+        self.seed = metadata["seed"]
+        self.boards = np.load(path, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.boards)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.boards[index]
+
+    def matches(self, width: int, height: int, num_mines: int, custom_mask: List[Tuple[int, int]]) -> bool:
+        return (self.width, self.height, self.num_mines) == (width, height, num_mines) and \
+            self.custom_mask == [tuple(offset) for offset in custom_mask]
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Pregenerate a memory-mapped bank of Minesweeper boards")
+    parser.add_argument("path", type=str, help="Output .npy file (metadata goes to <path>.json)")
+    parser.add_argument("--width", type=int, default=30)
+    parser.add_argument("--height", type=int, default=16)
+    parser.add_argument("--num-mines", type=int, default=99)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--custom-mask", type=json.loads, default=None,
+                        help='Neighbour offsets as JSON, e.g. "[[-1, 0], [1, 0], [0, -1], [0, 1]]" (default: all 8)')
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.path)), exist_ok=True)
+    start = time.perf_counter()
+    custom_mask = [tuple(offset) for offset in args.custom_mask] if args.custom_mask is not None else None
+    generate_board_bank(args.path, args.width, args.height, args.num_mines, args.count, custom_mask=custom_mask,
+                        seed=args.seed)
+    print(f"Wrote {args.count} boards to {args.path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,54 @@
 # backend/game.py
 
+import time
+
+from . import metrics
 from .board import MinesweeperBoard
+from .neighbors import DEFAULT_NEIGHBORS
+from .solver import generate_no_guess_layout
 
 class GameSession:
     """
     A wrapper around MinesweeperBoard that manages game state and turn flow.
     """
-    DEFAULT_NEIGHBORS = [
-        (-1, -1), (-1, 0), (-1, 1),
-        (0, -1),          (0, 1),
-        (1, -1), (1, 0), (1, 1)
-    ]
+    DEFAULT_NEIGHBORS = DEFAULT_NEIGHBORS
 
-    def __init__(self, width: int, height: int, num_mines: int, seed: int = None, custom_mask: list[tuple[int, int]] | None = None):
+    def __init__(self, width: int, height: int, num_mines: int, seed: int = None, custom_mask: list[tuple[int, int]] | None = None,
+                 mine_layout: list[int] | None = None, board_bank=None, no_guess: bool = False):
         self.width = width
         self.height = height
         self.num_mines = num_mines
         self.seed = seed
         self.custom_mask = self.DEFAULT_NEIGHBORS if custom_mask is None else custom_mask
+        self.version = 0  # bumped by every reset and applied action
+
+        # With no_guess, generated boards can be solved by deduction alone after revealing safe_start
+        self.no_guess = no_guess
+        self.safe_start = (height // 2, width // 2)
+
+        # Optional BoardBank of pregenerated boards that reset(bank_index=...) draws from
+        if board_bank is not None and not board_bank.matches(width, height, num_mines, self.custom_mask):
+            raise ValueError("Board bank was generated for different board parameters")
+        self.board_bank = board_bank
 
-        self.reset()
+        self.reset(mine_layout=mine_layout)
 
     def step(self, action: str, row: int, col: int) -> dict:
         """
         Apply an action ("reveal" or "flag") at position (row, col).
         Returns a dict describing the game state after the action.
         """
+        self.apply_action(action, row, col)
+        return self.get_state()
+
+    def apply_action(self, action: str, row: int, col: int) -> bool:
+        """
+        Apply an action like step(), without building the visible state.
+        Returns False if the game was already over and nothing was applied.
+        """
         if self.game_over:
-            return self.get_state()
+            return False
+        start = time.perf_counter() if metrics.enabled else None
 
         if action == "reveal":
             hit_mine = self.board.reveal(row, col)
@@ -42,7 +63,34 @@ class GameSession:
             self.board.flag(row, col)
 
         self.moves_made += 1
-        return self.get_state()
+        self.version += 1
+        if start is not None:
+            metrics.record_game_step(action, time.perf_counter() - start)
+        return True
+
+    def step_delta(self, action: str, row: int, col: int, known_version: int = None) -> dict:
+        """
+        Apply an action like step(), but return only the status fields, the new state
+        version and a "changes" list of [row, col, value] for cells whose visible value
+        changed. The full "board" is returned instead when the game ends or when
+        known_version does not match the state the client last saw.
+        """
+        in_sync = known_version is None or known_version == self.version
+        was_over = self.game_over
+        applied = self.apply_action(action, row, col)
+
+        state = self._get_status()
+        if not in_sync or (self.game_over and not was_over):
+            state["board"] = self.board.get_visible_state(game_over_flag=self.game_over, game_won_flag=self.won)
+        elif not applied:
+            state["changes"] = []
+        elif action == "reveal":
+            state["changes"] = [[r, c, int(self.board.board[r, c])] for r, c in self.board.last_revealed]
+        elif self.board.is_valid_coord(row, col) and not self.board.is_revealed(row, col):
+            state["changes"] = [[row, col, "F" if self.board.is_flagged(row, col) else None]]
+        else:
+            state["changes"] = []
+        return state
 
     def get_state(self) -> dict:
         """
@@ -50,21 +98,37 @@ class GameSession:
         """
         return {
             "board": self.board.get_visible_state(game_over_flag=self.game_over, game_won_flag=self.won),
+            **self._get_status()
+        }
+
+    def _get_status(self) -> dict:
+        return {
             "game_over": self.game_over,
             "won": self.won,
             "moves_made": self.moves_made,
             "dimensions": (self.height, self.width),
-            "num_mines": self.num_mines
+            "num_mines": self.num_mines,
+            "version": self.version
         }
 
-    def reset(self):
+    def reset(self, seed: int = None, mine_layout: list[int] | None = None, bank_index: int = None):
         """
         Reset the game session to a fresh state with the same parameters.
+        If given, seed is used for this board's layout instead of the session seed,
+        mine_layout (flat mine indices) places the mines directly, and bank_index
+        takes a precomputed board from the session's board bank.
         """
-        self.board = MinesweeperBoard(self.width, self.height, self.num_mines, self.seed, self.custom_mask)
+        board_seed = self.seed if seed is None else seed
+        board_values = self.board_bank[bank_index] if bank_index is not None else None
+        if self.no_guess and mine_layout is None and board_values is None:
+            mine_layout = generate_no_guess_layout(self.width, self.height, self.num_mines, self.safe_start,
+                                                   self.custom_mask, board_seed)
+        self.board = MinesweeperBoard(self.width, self.height, self.num_mines, board_seed, self.custom_mask,
+                                      mine_layout, board_values)
         self.game_over = False
         self.won = False
         self.moves_made = 0
+        self.version += 1
 
     def is_game_over(self) -> bool:
         return self.game_over
@@ -77,11 +141,25 @@ class GameSession:
         Compute a basic score based on how much of the board is revealed.
         Could be used to give intermediate rewards to agents.
         """
-        revealed_count = sum(
-            1 for r in range(self.height) for c in range(self.width)
-            if self.board.is_revealed(r, c)
-        )
-        return revealed_count / (self.height * self.width)
+        return self.board.revealed_count / (self.height * self.width)
+
+    def get_num_revealed(self) -> int:
+        return self.board.revealed_count
+
+    def get_num_safe_revealed(self) -> int:
+        return self.board.safe_revealed
+
+    def get_num_flags(self) -> int:
+        return self.board.num_flags
+
+    def get_num_false_flags(self) -> int:
+        return self.board.incorrect_flags
+
+    def get_num_hidden(self) -> int:
+        """
+        Number of cells that are neither revealed nor flagged.
+        """
+        return self.height * self.width - self.board.revealed_count - self.board.num_flags
 
     def reveal_full_board(self):
         """
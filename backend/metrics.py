@@ -0,0 +1,207 @@
+# backend/metrics.py
+#
+# Optional counters and latency histograms for the game engine, envs and web API.
+# Disabled by default: instrumented code only checks `metrics.enabled`, so the cost
+# when off is one attribute lookup per call. Enable with enable() or by setting the
+# MINESWEEPER_METRICS=1 environment variable; read with snapshot() in process or
+# render_prometheus() (served at /metrics by frontend/app.py).
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+enabled = os.environ.get("MINESWEEPER_METRICS", "0") not in ("", "0", "false", "False")
+
+LATENCY_BUCKETS = (1e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 10000, 100000, 1000000)
+
+
+class Counter:
+    """
+    A monotonically increasing value per combination of label values.
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[Dict]:
+        with self._lock:
+            return [{"labels": dict(zip(self.labelnames, labels)), "value": value}
+                    for labels, value in sorted(self._values.items())]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """
+    Observation counts in fixed buckets (upper bounds), plus their sum and count,
+    per combination of label values.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._values = {}   # labels -> [per-bucket counts (last is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    def samples(self) -> List[Dict]:
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in sorted(self._values.items())]
+        samples = []
+        for labels, counts, total in values:
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                cumulative[bound] = running
+            samples.append({
+                "labels": dict(zip(self.labelnames, labels)),
+                "count": running,
+                "sum": total,
+                "mean": total / running if running else 0.0,
+                "buckets": cumulative,
+            })
+        return samples
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+_registry: Dict[str, object] = {}
+_started = time.time()
+
+
+def counter(name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return _registry.setdefault(name, Counter(name, help, labelnames))
+
+
+def histogram(name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+    return _registry.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+
+GAME_STEPS = counter("minesweeper_game_steps_total", "Actions applied to game sessions", ("action",))
+GAME_STEP_SECONDS = histogram("minesweeper_game_step_seconds", "Time to apply a game action", ("action",))
+BOARD_REVEALS = counter("minesweeper_board_reveals_total", "Calls to MinesweeperBoard.reveal")
+REVEALED_CELLS = counter("minesweeper_revealed_cells_total", "Cells opened by reveals, flood fills included")
+FLOOD_FILL_CELLS = histogram("minesweeper_flood_fill_cells", "Cells opened per reveal", buckets=SIZE_BUCKETS)
+REVEAL_SECONDS = histogram("minesweeper_reveal_seconds", "Time per MinesweeperBoard.reveal")
+ENV_STEPS = counter("minesweeper_env_steps_total", "MinesweeperEnv.step calls")
+ENV_STEP_SECONDS = histogram("minesweeper_env_step_seconds", "Time per MinesweeperEnv.step")
+HTTP_REQUESTS = counter("minesweeper_http_requests_total", "HTTP requests handled",
+                        ("route", "method", "status"))
+HTTP_REQUEST_SECONDS = histogram("minesweeper_http_request_seconds", "HTTP request latency", ("route", "method"))
+
+
+def record_reveal(cells: int, seconds: float):
+    BOARD_REVEALS.inc()
+    REVEALED_CELLS.inc(cells)
+    FLOOD_FILL_CELLS.observe(cells)
+    REVEAL_SECONDS.observe(seconds)
+
+
+def record_game_step(action: str, seconds: float):
+    GAME_STEPS.inc(1, action)
+    GAME_STEP_SECONDS.observe(seconds, action)
+
+
+def record_env_step(seconds: float):
+    ENV_STEPS.inc()
+    ENV_STEP_SECONDS.observe(seconds)
+
+
+def record_request(route: str, method: str, status: int, seconds: float):
+    HTTP_REQUESTS.inc(1, route, method, str(status))
+    HTTP_REQUEST_SECONDS.observe(seconds, route, method)
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """
+    Clear every recorded value and restart the clock used for rates.
+    """
+    global _started
+    for metric in _registry.values():
+        metric.clear()
+    _started = time.time()
+
+
+def snapshot() -> Dict:
+    """
+    Return all metrics as plain data: {"uptime_seconds": ..., "metrics": {name: {...}}}.
+    Counters carry a "rate" per second since the last reset, e.g. reveals/sec.
+    """
+    uptime = time.time() - _started
+    result = {}
+    for name, metric in _registry.items():
+        samples = metric.samples()
+        if metric.kind == "counter":
+            for sample in samples:
+                sample["rate"] = sample["value"] / uptime if uptime > 0 else 0.0
+        result[name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+    return {"enabled": enabled, "uptime_seconds": uptime, "metrics": result}
+
+
+def _format_labels(labels: Dict, extra: Tuple[str, str] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render_prometheus() -> str:
+    """
+    Render all metrics in the Prometheus text exposition format (version 0.0.4).
+    """
+    lines = []
+    for name, metric in _registry.items():
+        lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for sample in metric.samples():
+            labels = sample["labels"]
+            if metric.kind == "counter":
+                lines.append(f"{name}{_format_labels(labels)} {sample['value']}")
+                continue
+            for bound, count in sample["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', _format_bound(bound)))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {sample['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,110 @@
+# backend/neighbors.py
+
+from functools import cached_property, lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+DEFAULT_NEIGHBORS = [
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1),          (0, 1),
+    (1, -1), (1, 0), (1, 1)
+]
+
+_BLOCK_ROWS = 32
+
+
+class NeighborIndex:
+    """
+    Precomputed neighbours of every cell of a width x height board under a mask.
+
+    Cells are flat indices (row * width + col). The neighbours of cell i are
+    indices[indptr[i]:indptr[i + 1]] (CSR layout), and the cells whose neighbours
+    include i are reverse_indices[reverse_indptr[i]:reverse_indptr[i + 1]]; the
+    two differ only for asymmetric masks. `table` holds the same neighbours as a
+    (cells, mask size) array padded with num_cells for vectorised lookups, and
+    `lists` and `reverse_lists` hold them as Python lists for loops. The lists
+    are built on first use, and neighbors() builds coordinates one band of rows
+    at a time, so very large boards that only flood a region never pay for all cells.
+
+    Instances are shared, so never modify them: the index arrays are read-only,
+    and only the lazily built views above are filled in after construction.
+    Get instances from get_neighbor_index.
+    """
+
+    def __init__(self, width: int, height: int, custom_mask: Tuple[Tuple[int, int], ...]):
+        self.width = width
+        self.height = height
+        self.custom_mask = custom_mask
+        self.num_cells = width * height
+
+        rows, cols = np.divmod(np.arange(self.num_cells), width)
+        table = np.full((self.num_cells, len(custom_mask)), self.num_cells, dtype=np.int64)
+        for k, (dr, dc) in enumerate(custom_mask):
+            nr, nc = rows + dr, cols + dc
+            inside = (nr >= 0) & (nr < height) & (nc >= 0) & (nc < width)
+            table[inside, k] = (nr * width + nc)[inside]
+        valid = table < self.num_cells
+
+        self.table = table
+        self.indptr = np.concatenate([[0], np.cumsum(valid.sum(axis=1))])
+        self.indices = table[valid]
+
+        sources = np.repeat(np.arange(self.num_cells), valid.sum(axis=1))
+        order = np.argsort(self.indices, kind="stable")
+        self.reverse_indptr = np.concatenate([[0], np.cumsum(np.bincount(self.indices, minlength=self.num_cells))])
+        self.reverse_indices = sources[order]
+
+        for array in (self.table, self.indptr, self.indices, self.reverse_indptr, self.reverse_indices):
+            array.setflags(write=False)
+
+        # Coordinate lists are built on demand, _BLOCK_ROWS board rows at a time
+        self._coord_blocks = [None] * (-(-height // _BLOCK_ROWS))
+
+    @cached_property
+    def lists(self) -> List[List[int]]:
+        return _split(self.indices.tolist(), self.indptr.tolist())
+
+    @cached_property
+    def reverse_lists(self) -> List[List[int]]:
+        return _split(self.reverse_indices.tolist(), self.reverse_indptr.tolist())
+
+    def neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
+        """
+        The (row, col) neighbours of a cell.
+        """
+        block = self._coord_blocks[row // _BLOCK_ROWS]
+        if block is None:
+            block = self._build_coord_block(row // _BLOCK_ROWS)
+        return block[(row % _BLOCK_ROWS) * self.width + col]
+
+    def _build_coord_block(self, b):
+        first = b * _BLOCK_ROWS * self.width
+        last = min((b + 1) * _BLOCK_ROWS, self.height) * self.width
+        start, stop = self.indptr[first], self.indptr[last]
+        rows, cols = np.divmod(self.indices[start:stop], self.width)
+        pairs = list(zip(rows.tolist(), cols.tolist()))
+        block = self._coord_blocks[b] = _split(pairs, (self.indptr[first:last + 1] - start).tolist())
+        return block
+
+    def __reduce__(self):
+        # Pickled and copied boards share the cached index instead of carrying their own
+        return get_neighbor_index, (self.width, self.height, self.custom_mask)
+
+
+def _split(values, indptr):
+    return [values[start:stop] for start, stop in zip(indptr[:-1], indptr[1:])]
+
+
+@lru_cache(maxsize=64)
+def _build(width, height, custom_mask):
+    return NeighborIndex(width, height, custom_mask)
+
+
+def get_neighbor_index(width: int, height: int, custom_mask: List[Tuple[int, int]] = None) -> NeighborIndex:
+    """
+    Return the shared NeighborIndex for a board size and mask (8-way by default),
+    building it on first use.
+    """
+    mask = DEFAULT_NEIGHBORS if custom_mask is None else custom_mask
+    return _build(width, height, tuple((int(dr), int(dc)) for dr, dc in mask))
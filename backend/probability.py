@@ -0,0 +1,275 @@
+# backend/probability.py
+
+from collections import defaultdict, deque
+from math import comb
+from typing import Dict, List, Tuple
+
+import numpy as np
+from .neighbors import get_neighbor_index
+
+
+class MineProbabilityEngine:
+    """
+    Exact mine probabilities for every hidden cell of a visible board.
+
+    Revealed numbers constrain the hidden cells they count (the frontier). The
+    frontier splits into components that share no constraint; each component is
+    enumerated on its own, with cells that belong to exactly the same constraints
+    grouped so a group of s cells is one choice of 0..s mines. The per-component
+    mine-count distributions are then combined with binomial weights for the
+    unconstrained interior cells under the global mine count.
+
+    Component results are cached by their constraints, so after a move only the
+    components whose constraints changed are enumerated again.
+    """
+
+    def __init__(self, width: int, height: int, num_mines: int, custom_mask: List[Tuple[int, int]] = None):
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        self._neighbors = get_neighbor_index(width, height, custom_mask).lists
+        self._cache = {}
+
+    def compute(self, visible_state: list) -> np.ndarray:
+        """
+        Return a (height, width) array with the probability that each cell is a mine.
+        Revealed cells get 0 and shown mines 1. Flags are not trusted: flagged cells
+        are treated as hidden. Raises ValueError if no layout fits the board.
+        """
+        cells = [value for row in visible_state for value in row]
+        known_mines = {i for i, value in enumerate(cells) if value in ("*", "M")}
+        hidden = {i for i, value in enumerate(cells) if not isinstance(value, int) and i not in known_mines}
+
+        constraints = []
+        for i, value in enumerate(cells):
+            if not isinstance(value, int):
+                continue
+            unknown = tuple(j for j in self._neighbors[i] if j in hidden)
+            remaining = value - sum(1 for j in self._neighbors[i] if j in known_mines)
+            if unknown:
+                constraints.append((unknown, remaining))
+            elif remaining != 0:
+                raise ValueError(f"Cell {divmod(i, self.width)} shows more mines than can fit around it")
+
+        cache, self._cache = self._cache, {}
+        components = []
+        for component in _split_components(constraints):
+            key = frozenset(component)
+            result = cache.get(key) or self._cache.get(key)
+            if result is None:
+                result = _enumerate_component(component)
+                if not result[0]:
+                    raise ValueError("No mine layout is consistent with the visible board")
+            self._cache[key] = result
+            components.append(result)
+
+        frontier = {j for unknown, _ in constraints for j in unknown}
+        probabilities = np.zeros(self.width * self.height)
+        probabilities[list(known_mines)] = 1.0
+        interior = [j for j in hidden if j not in frontier]
+        self._combine(components, interior, self.num_mines - len(known_mines), probabilities)
+        return probabilities.reshape(self.height, self.width)
+
+    def _combine(self, components, interior, mines_left, probabilities):
+        n_interior = len(interior)
+
+        def interior_ways(m):
+            rest = mines_left - m
+            return comb(n_interior, rest) if 0 <= rest <= n_interior else 0
+
+        # prefix[j] is the mine-count distribution of components before j, suffix[j] of those from j on
+        distributions = [_as_polynomial(weights) for weights, _, _ in components]
+        prefix = [[1]]
+        for dist in distributions:
+            prefix.append(_convolve(prefix[-1], dist))
+        suffix = [[1]]
+        for dist in reversed(distributions):
+            suffix.append(_convolve(suffix[-1], dist))
+        suffix.reverse()
+
+        total = prefix[-1]
+        z = sum(ways * interior_ways(m) for m, ways in enumerate(total))
+        if z == 0:
+            raise ValueError("No mine layout is consistent with the visible board and mine count")
+
+        for j, (weights, groups, group_mines) in enumerate(components):
+            others = _convolve(prefix[j], suffix[j + 1])
+            for k in weights:
+                rest_ways = sum(ways * interior_ways(k + m) for m, ways in enumerate(others))
+                if rest_ways == 0:
+                    continue
+                for group, mines in zip(groups, group_mines[k]):
+                    p = mines * rest_ways / (z * len(group))
+                    for cell in group:
+                        probabilities[cell] += p
+
+        if n_interior:
+            expected = sum(ways * interior_ways(m) * (mines_left - m) for m, ways in enumerate(total))
+            probabilities[interior] = expected / (z * n_interior)
+
+
+def _split_components(constraints):
+    """
+    Group constraints that are connected through shared cells.
+    """
+    parent = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for unknown, _ in constraints:
+        for j in unknown:
+            parent.setdefault(j, j)
+        root = find(unknown[0])
+        for j in unknown[1:]:
+            parent[find(j)] = root
+
+    components = defaultdict(list)
+    for constraint in constraints:
+        components[find(constraint[0][0])].append(constraint)
+    return list(components.values())
+
+
+class _GiveUp(Exception):
+    pass
+
+
+def _enumerate_component(constraints, max_nodes: int = None):
+    """
+    Count the mine assignments of one component.
+
+    Returns (weights, groups, group_mines): weights[k] is the number of assignments
+    with k mines, groups are tuples of cells in exactly the same constraints, and
+    group_mines[k][g] is the total number of mines in group g over those assignments.
+    Returns None instead once the search visits more than max_nodes nodes.
+    """
+    constraints = _bfs_order(constraints)
+    membership = defaultdict(list)
+    for ci, (unknown, _) in enumerate(constraints):
+        for j in unknown:
+            membership[j].append(ci)
+    by_signature = defaultdict(list)
+    for j, cis in membership.items():
+        by_signature[tuple(cis)].append(j)
+    # Assign groups in the order their constraints appear so constraints are closed early
+    signatures = sorted(by_signature, key=lambda sig: (max(sig), min(sig)))
+    groups = [tuple(by_signature[sig]) for sig in signatures]
+    sizes = [len(group) for group in groups]
+
+    need = [remaining for _, remaining in constraints]
+    capacity = [len(unknown) for unknown, _ in constraints]
+    assignment = [0] * len(groups)
+    weights: Dict[int, int] = defaultdict(int)
+    group_mines: Dict[int, List[int]] = {}
+    nodes = 0
+
+    def search(g, k, w):
+        nonlocal nodes
+        nodes += 1
+        if max_nodes is not None and nodes > max_nodes:
+            raise _GiveUp
+        if g == len(groups):
+            weights[k] += w
+            mines = group_mines.setdefault(k, [0] * len(groups))
+            for i, x in enumerate(assignment):
+                if x:
+                    mines[i] += w * x
+            return
+
+        size, sig = sizes[g], signatures[g]
+        for ci in sig:
+            capacity[ci] -= size
+        low = max(0, max(need[ci] - capacity[ci] for ci in sig))
+        high = min(size, min(need[ci] for ci in sig))
+        for x in range(low, high + 1):
+            for ci in sig:
+                need[ci] -= x
+            assignment[g] = x
+            search(g + 1, k + x, w * comb(size, x))
+            for ci in sig:
+                need[ci] += x
+        assignment[g] = 0
+        for ci in sig:
+            capacity[ci] += size
+
+    try:
+        search(0, 0, 1)
+    except _GiveUp:
+        return None
+    return dict(weights), groups, group_mines
+
+
+def _bfs_order(constraints):
+    """
+    Order constraints breadth-first through shared cells, so neighbours are adjacent.
+    """
+    by_cell = defaultdict(list)
+    for ci, (unknown, _) in enumerate(constraints):
+        for j in unknown:
+            by_cell[j].append(ci)
+
+    order, seen = [], set()
+    for start in range(len(constraints)):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            ci = queue.popleft()
+            order.append(constraints[ci])
+            for j in constraints[ci][0]:
+                for other in by_cell[j]:
+                    if other not in seen:
+                        seen.add(other)
+                        queue.append(other)
+    return order
+
+
+def _as_polynomial(weights):
+    poly = [0] * (max(weights) + 1)
+    for k, ways in weights.items():
+        poly[k] = ways
+    return poly
+
+
+def _convolve(a, b):
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+
+def mine_probabilities(visible_state: list, num_mines: int, custom_mask: List[Tuple[int, int]] = None) -> np.ndarray:
+    """
+    One-off MineProbabilityEngine.compute without keeping a cache between moves.
+    """
+    height, width = len(visible_state), len(visible_state[0])
+    return MineProbabilityEngine(width, height, num_mines, custom_mask).compute(visible_state)
+
+
+if __name__ == "__main__":
+    import time
+    from .game import GameSession
+
+    # Play hard boards always revealing the safest cell, timing the engine on every step
+    timings = []
+    for seed in range(5):
+        game = GameSession(width=30, height=16, num_mines=99, seed=seed)
+        engine = MineProbabilityEngine(30, 16, 99)
+        game.step("reveal", 8, 15)
+        while not game.is_game_over():
+            state = game.get_state()["board"]
+            start = time.perf_counter()
+            probabilities = engine.compute(state)
+            timings.append(time.perf_counter() - start)
+            hidden = np.array([[not isinstance(v, int) for v in row] for row in state])
+            probabilities[~hidden] = 2.0
+            row, col = np.unravel_index(np.argmin(probabilities), probabilities.shape)
+            game.step("reveal", int(row), int(col))
+        print(f"seed {seed}: {'WIN' if game.is_win() else 'loss'} after {game.moves_made} moves")
+    print(f"{len(timings)} calls, mean {np.mean(timings) * 1e3:.2f} ms, max {np.max(timings) * 1e3:.2f} ms")
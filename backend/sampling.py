@@ -0,0 +1,695 @@
+# backend/sampling.py
+
+import time
+from itertools import chain
+from math import lgamma, log
+from typing import List, Tuple
+
+import numpy as np
+from .neighbors import get_neighbor_index
+from .probability import _enumerate_component
+
+# Codes for the non-number cells of a visible board: hidden (flags are not trusted) and shown mines
+_CELL_CODES = {None: -1, "F": -1, "X": -1, "*": -2, "M": -2}
+
+
+class SampledProbabilityEstimator:
+    """
+    Anytime estimate of per-cell mine probabilities for boards too large to enumerate.
+
+    The frontier (hidden cells counted by a revealed number) splits into components
+    that share no number. Components that MineProbabilityEngine's search counts in at
+    most exact_nodes steps are counted exactly, and those counts are cached until the
+    component changes; only the rest are sampled. A component too large to count
+    costs about 5 us per allowed step before it is given up on, and is cached as such.
+
+    A batch of Markov chains samples mine layouts of the remaining frontier. Chains
+    move by Metropolis flips of single cells
+    under exp(-beta * violations) * lam ** mines, where violations is how far the
+    revealed numbers are from being satisfied. Cells that share no number are
+    independent under that target, so a whole colour class of cells is updated at
+    once for every chain with NumPy. Swaps of a mine with a nearby empty cell move
+    between layouts that satisfy the same numbers.
+
+    Chains run at inverse temperatures spread over beta_range: cold chains stay on
+    valid layouts, hot ones move between them more freely, and neighbouring chains
+    exchange their layouts of a component when the Metropolis rule allows it.
+
+    The frontier splits into components that share no number, and a chain's layout
+    of a component is used whenever that component's numbers are all satisfied.
+    Dividing the per-component samples by lam ** mines gives estimates of how many
+    layouts each component has per mine count, which are then combined with the
+    binomial number of interior layouts under the board's total mine count, the
+    same way MineProbabilityEngine combines its exact counts.
+
+    The chains are kept between calls and remapped onto the new frontier, so
+    after a move sampling resumes from layouts that were already nearly valid.
+    A component that no chain satisfies gets one valid layout from a short
+    depth-first search to start from; components still unsatisfied when the
+    budget runs out are estimated from their least violating layouts.
+
+    Sampling alone is slow to converge. On a 30x16/99 board with a 66-cell frontier
+    the largest error against the exact probabilities (median over seeds) is about
+    0.78 after 10 ms (2 samples per component), 0.22 after 0.1 s (600 samples), 0.07
+    after 0.5 s and 0.04 after 1 s (10000 samples), while counting it takes 4 ms.
+    Playing 100x100/1600 boards on a 10 ms budget, calls take 11-17 ms (median) with
+    everything counted exactly; positions with a component over exact_nodes steps get
+    only a few samples of it per call and can be off by more than 0.5 there.
+    """
+
+    def __init__(self, width: int, height: int, num_mines: int, custom_mask: List[Tuple[int, int]] = None,
+                 num_chains: int = 64, beta_range: Tuple[float, float] = (1.5, 5.0), burn_in: int = 5,
+                 exact_nodes: int = 5000, seed: int = None):
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        self.num_chains = num_chains
+        self.betas = np.geomspace(beta_range[0], beta_range[1], num_chains)
+        self.burn_in = burn_in      # sweeps before samples are collected when starting cold
+        self.exact_nodes = exact_nodes  # search steps allowed to count a component exactly; 0 samples everything
+        self.rng = np.random.default_rng(seed)
+        index = get_neighbor_index(width, height, custom_mask)
+        custom_mask = index.custom_mask
+        self._neighbors = index.table    # (cells, offsets), num_cells where off the board
+        rows, cols = np.divmod(np.arange(index.num_cells), width)
+        # Cells in the same class are never counted by the same number
+        self._span = (2 * max((abs(dr) for dr, _ in custom_mask), default=0) + 1,
+                      2 * max((abs(dc) for _, dc in custom_mask), default=0) + 1)
+        self._colour = (rows % self._span[0]) * self._span[1] + cols % self._span[1]
+        # Offsets between two cells that can be counted by the same number
+        self._swap_offsets = sorted({(r1 - r2, c1 - c2) for r1, c1 in custom_mask for r2, c2 in custom_mask} - {(0, 0)})
+
+        self._chains = None         # (num_chains, frontier) mine layouts from the last call
+        self._chain_cells = None    # board index of each chain column
+        self._exact_cache = {}      # component constraints -> exact counts, or None if too large to count
+        self.last_num_samples = 0
+
+    def estimate(self, visible_state: list, time_budget: float = None, num_samples: int = None,
+                 max_sweeps: int = 1000) -> np.ndarray:
+        """
+        Return a (height, width) array of estimated mine probabilities.
+
+        Sampling stops once every sampled component has num_samples valid layouts or
+        time_budget seconds have passed, whichever comes first (1000 samples if neither
+        is given), and in any case after max_sweeps sweeps; last_num_samples tells how
+        many were collected. With a time budget, exact counting gets at most half of it.
+        Revealed cells get 0 and shown mines 1; flags are treated as hidden. Raises
+        ValueError if no layout fits the board.
+        """
+        if time_budget is None and num_samples is None:
+            num_samples = 1000
+        start = time.perf_counter()
+        deadline = None if time_budget is None else start + time_budget
+
+        problem = self._build_problem(visible_state)
+        frontier, interior_size, mines_left = problem["frontier"], problem["interior_size"], problem["mines_left"]
+        probabilities = np.zeros(self.width * self.height)
+        probabilities[problem["known_mines"]] = 1.0
+        hidden = problem["hidden"]
+        self.last_num_samples = 0
+
+        if frontier.size == 0:
+            self._chains, self._chain_cells = None, None
+            if interior_size:
+                probabilities[hidden] = mines_left / interior_size
+            return probabilities.reshape(self.height, self.width)
+
+        cell_starts, cell_component = problem["cell_starts"], problem["cell_component"]
+        num_components = cell_starts.size
+        sizes = np.diff(np.append(cell_starts, frontier.size))
+        max_mines = int(sizes.max()) + 1
+        # Relative number of layouts per (component, mine count), and of mines per (cell, mine count of its component)
+        layouts = np.zeros((num_components, max_mines))
+        cell_mines = np.zeros((frontier.size, max_mines))
+
+        exact = self._count_exactly(problem, layouts, cell_mines, None if deadline is None else start + time_budget / 2)
+        sampled = np.flatnonzero(~exact)
+
+        # Per-cell odds of a mine in the sampled target: the expected interior density
+        density = min(max(mines_left / (interior_size + frontier.size), 1e-6), 1 - 1e-6)
+        log_lam = log(density / (1 - density))
+        if sampled.size:
+            subproblem = self._restrict(problem, sampled)
+            cells = np.isin(cell_component, sampled)
+            layouts[sampled], cell_mines[cells] = self._sample(subproblem, max_mines, density, log_lam, deadline,
+                                                               num_samples, max_sweeps)
+        else:
+            self._chains, self._chain_cells = None, None
+
+        # Relative number of layouts per component and mine count, undoing the lam ** mines bias of samples
+        log_layouts = np.full(layouts.shape, -np.inf)
+        seen = layouts > 0
+        log_layouts[seen] = np.log(layouts[seen])
+        log_layouts[sampled] -= np.arange(max_mines) * log_lam
+        log_layouts -= log_layouts.max(axis=1, keepdims=True)
+        distributions = np.exp(log_layouts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            conditional = np.nan_to_num(cell_mines / layouts[cell_component])
+
+        distributions = [distributions[j, :sizes[j] + 1] for j in range(num_components)]
+        log_interior = np.full(frontier.size + 1, -np.inf)
+        for m in range(frontier.size + 1):
+            r = mines_left - m
+            if 0 <= r <= interior_size:
+                log_interior[m] = lgamma(interior_size + 1) - lgamma(r + 1) - lgamma(interior_size - r + 1)
+        interior_ways = np.exp(log_interior - log_interior.max())
+
+        # Prefix and suffix products of the component distributions, rescaled to avoid overflow
+        prefix = [np.ones(1)]
+        for dist in distributions:
+            prefix.append(_normalised(np.convolve(prefix[-1], dist)))
+        suffix = [np.ones(1)]
+        for dist in distributions[::-1]:
+            suffix.append(_normalised(np.convolve(suffix[-1], dist)))
+        suffix.reverse()
+
+        for j in range(num_components):
+            others = np.convolve(prefix[j], suffix[j + 1])
+            # rest[k]: weight of every other component and the interior when component j holds k mines
+            rest = np.correlate(interior_ways[:sizes[j] + others.size], others, mode="valid")
+            weights = distributions[j] * rest
+            cells = slice(cell_starts[j], cell_starts[j] + sizes[j])
+            probabilities[frontier[cells]] = conditional[cells, :sizes[j] + 1] @ weights / weights.sum()
+
+        if interior_size:
+            total = prefix[-1] * interior_ways
+            expected = total @ (mines_left - np.arange(total.size))
+            interior = np.setdiff1d(hidden, frontier, assume_unique=True)
+            probabilities[interior] = expected / (total.sum() * interior_size)
+        return np.clip(probabilities, 0.0, 1.0).reshape(self.height, self.width)
+
+    def _count_exactly(self, problem, layouts, cell_mines, deadline):
+        """
+        Enumerate the components whose layouts take at most exact_nodes search steps to
+        count, writing their counts into rows of layouts and cell_mines, and return which
+        components were counted. Counts are cached for as long as a component stays
+        unchanged, as are the components found too large; no new component is started
+        after deadline, so a call overruns it by at most one search of exact_nodes steps.
+        """
+        frontier, values, constraint_cells = problem["frontier"], problem["values"], problem["constraint_cells"]
+        cons_ends = np.append(problem["constraint_starts"][1:], problem["num_constraints"])
+        exact = np.zeros(problem["cell_starts"].size, dtype=bool)
+        cache, self._exact_cache = self._exact_cache, {}
+        if self.exact_nodes <= 0:
+            return exact
+        board_cells = np.append(frontier, -1)
+        column = np.zeros(self.width * self.height, dtype=np.int64)
+        column[frontier] = np.arange(frontier.size)
+
+        for j, (first, last) in enumerate(zip(problem["constraint_starts"].tolist(), cons_ends.tolist())):
+            # A component is the same as long as its numbers count the same cells
+            cells, remaining = board_cells[constraint_cells[first:last]], values[first:last]
+            key = cells.tobytes() + remaining.tobytes()
+            if key in cache:
+                result = cache[key]
+            elif deadline is not None and time.perf_counter() >= deadline:
+                continue
+            else:
+                constraints = [(tuple(cell for cell in row if cell >= 0), value)
+                               for row, value in zip(cells.tolist(), remaining.tolist())]
+                result = _exact_counts(_enumerate_component(constraints, max_nodes=self.exact_nodes))
+            self._exact_cache[key] = result
+            if result is not None:
+                mine_counts, ways, cells, mines = result
+                layouts[j, mine_counts] = ways
+                cell_mines[np.ix_(column[cells], mine_counts)] = mines
+                exact[j] = True
+        return exact
+
+        for j, (first, last) in enumerate(zip(problem["constraint_starts"].tolist(), cons_ends.tolist())):
+            constraints = [(tuple(frontier[cells[cells < frontier.size]].tolist()), int(value))
+                           for cells, value in zip(constraint_cells[first:last], values[first:last])]
+            key = frozenset(constraints)
+            if key in cache:
+                result = cache[key]
+            elif deadline is not None and time.perf_counter() >= deadline:
+                continue
+            else:
+                result = _enumerate_component(constraints, max_nodes=self.exact_nodes)
+            self._exact_cache[key] = result
+            if result is None:
+                continue
+            weights, groups, group_mines = result
+            if not weights:
+                raise ValueError("No mine layout is consistent with the visible board")
+            most = max(weights.values())
+            for k, ways in weights.items():
+                layouts[j, k] = ways / most
+                for group, mines in zip(groups, group_mines[k]):
+                    cell_mines[[column[cell] for cell in group], k] = mines / (len(group) * most)
+            exact[j] = True
+        return exact
+
+    def _sample(self, problem, max_mines, density, log_lam, deadline, num_samples, max_sweeps):
+        """
+        Run the chains on the problem's components and return their (layouts, cell_mines)
+        sample counts, biased by lam ** mines.
+        """
+        frontier = problem["frontier"]
+        burn_in = 0 if self._chains is not None else self.burn_in
+        x = self._warm_start(frontier, density)
+        self._seed_components(x, problem)
+        counts = self._constraint_counts(x, problem)
+        values = problem["values"]
+        cell_constraints = problem["cell_constraints"]
+        pad = problem["num_constraints"]
+        cell_starts, cons_starts = problem["cell_starts"], problem["constraint_starts"]
+        cell_component = problem["cell_component"]
+        constraint_component = problem["constraint_component"]
+        num_components = cell_starts.size
+
+        # Everything fixed during the call is indexed once: for every chain, the flat
+        # positions in counts of the numbers that count each cell, and their targets.
+        # Padded slots point at the last column, which is kept at 0 with target 0, so
+        # they always count as "away" and only shift delta by a constant.
+        counts_flat = counts.reshape(-1)
+        chain_base = (np.arange(self.num_chains) * counts.shape[1])[:, None, None]
+        num_slots = cell_constraints.shape[1]
+        flips = []
+        for colour in np.unique(self._colour[frontier]):
+            cls = np.flatnonzero(self._colour[frontier] == colour)
+            cons = cell_constraints[cls]
+            offset = (cons != pad).sum(axis=1) - 2 * num_slots
+            flips.append((cls, chain_base + cons, values[cons].astype(np.int8), offset.astype(np.float32)))
+        swap_classes = self._swap_classes(frontier)
+        swaps = {}
+        betas = self.betas[:, None].astype(np.float32)
+        lam = np.float32(log_lam)
+
+        # Valid samples per (component, mine count), and mines per (cell, mine count of its component)
+        layouts = np.zeros((num_components, max_mines))
+        cell_mines = np.zeros((frontier.size, max_mines))
+        # The same for each sweep's least violating layouts, used for components never satisfied
+        near_layouts = np.zeros_like(layouts)
+        near_cell_mines = np.zeros_like(cell_mines)
+
+        def accumulate(chosen, component_mines, layouts, cell_mines):
+            layouts += np.bincount(
+                (np.arange(num_components) * max_mines + component_mines)[chosen],
+                minlength=num_components * max_mines,
+            ).reshape(num_components, max_mines)
+            cell_chosen = chosen[:, cell_component] & x
+            cell_k = component_mines[:, cell_component]
+            cell_mines += np.bincount(
+                (np.arange(frontier.size) * max_mines + cell_k)[cell_chosen],
+                minlength=frontier.size * max_mines,
+            ).reshape(frontier.size, max_mines)
+
+        sweep = 0
+        while True:
+            sweep += 1
+            # Metropolis acceptance as exp(-E) < ratio, with E standard exponential
+            noise = self.rng.standard_exponential((2, self.num_chains, frontier.size), dtype=np.float32)
+            for cls, index, target, offset in flips:
+                d = 1 - 2 * x[:, cls].view(np.int8)              # +1 adds a mine, -1 removes one
+                # Every number the cell counts moves one step away from or towards its target
+                away = (d[..., None] * (counts_flat[index] - target) >= 0).sum(axis=2, dtype=np.int8)
+                accept = noise[0][:, cls] > betas * (2 * away + offset) - d * lam
+                x[:, cls] ^= accept
+                counts_flat[index] += (accept * d)[..., None]
+                counts[:, -1] = 0
+
+            # Swaps keep the mine count, so they move between layouts that satisfy the same numbers
+            if swap_classes:
+                offset = int(self.rng.integers(len(swap_classes)))
+                if offset not in swaps:
+                    swaps[offset] = [self._prepare_swap(a, b, problem, chain_base) for a, b in swap_classes[offset]]
+                for swap in swaps[offset]:
+                    self._swap(x, counts, swap, noise[1], betas)
+
+            violations = np.add.reduceat(np.abs(counts[:, :-1] - values[:-1]), cons_starts, axis=1)
+            self._exchange(x, counts, violations, sweep % 2, cell_component, constraint_component)
+            component_mines = np.add.reduceat(x, cell_starts, axis=1, dtype=np.int64)
+            if sweep <= burn_in and (deadline is None or time.perf_counter() < deadline):
+                continue
+            accumulate(violations == 0, component_mines, layouts, cell_mines)
+            samples = int(layouts.sum(axis=1).min())
+            if samples == 0:
+                # Only needed while some component has no valid sample yet
+                accumulate(violations == violations.min(axis=0), component_mines, near_layouts, near_cell_mines)
+
+            if num_samples is not None and samples >= num_samples:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if sweep >= max_sweeps:
+                break
+
+        self._chains, self._chain_cells = x, frontier
+        self.last_num_samples = samples
+
+        # Components without a valid sample fall back to their least violating layouts
+        unsatisfied = layouts.sum(axis=1) == 0
+        layouts[unsatisfied] = near_layouts[unsatisfied]
+        cell_mines[unsatisfied[cell_component]] = near_cell_mines[unsatisfied[cell_component]]
+        return layouts, cell_mines
+
+    @staticmethod
+    def _restrict(problem, components):
+        """
+        The part of a problem from _build_problem made of the given components (sorted).
+        """
+        frontier, cell_component = problem["frontier"], problem["cell_component"]
+        keep_cells = np.isin(cell_component, components)
+        keep_constraints = np.isin(problem["constraint_component"], components)
+        # Old to new indices, with the old padding index mapped to the new one
+        cell_index = np.append(np.cumsum(keep_cells) - 1, keep_cells.sum())
+        constraint_index = np.append(np.cumsum(keep_constraints) - 1, keep_constraints.sum())
+        component_index = np.full(problem["cell_starts"].size, -1)
+        component_index[components] = np.arange(len(components))
+        cell_component = component_index[cell_component[keep_cells]]
+        constraint_component = component_index[problem["constraint_component"][keep_constraints]]
+        return {
+            "frontier": frontier[keep_cells],
+            "constraint_cells": cell_index[problem["constraint_cells"][keep_constraints]],
+            "cell_constraints": constraint_index[problem["cell_constraints"][keep_cells]],
+            "num_constraints": int(keep_constraints.sum()),
+            "values": np.append(problem["values"][:-1][keep_constraints], 0),
+            "cell_component": cell_component,
+            "cell_starts": np.searchsorted(cell_component, np.arange(len(components))),
+            "constraint_component": constraint_component,
+            "constraint_starts": np.searchsorted(constraint_component, np.arange(len(components))),
+        }
+
+    def _exchange(self, x, counts, violations, offset, cell_component, constraint_component):
+        """
+        Replica exchange between chains offset, offset + 2, ... and their hotter neighbours,
+        decided separately for every component.
+        """
+        i = np.arange(offset, self.num_chains - 1, 2)
+        j = i + 1
+        log_accept = (self.betas[i] - self.betas[j])[:, None] * (violations[i] - violations[j])
+        accept = np.log(self.rng.random(log_accept.shape)) < log_accept
+        if not accept.any():
+            return
+        for array, mask in ((x, accept[:, cell_component]), (counts[:, :-1], accept[:, constraint_component]),
+                            (violations, accept)):
+            first, second = array[i], array[j]
+            array[i] = np.where(mask, second, first)
+            array[j] = np.where(mask, first, second)
+
+    @staticmethod
+    def _prepare_swap(a, b, problem, chain_base):
+        """
+        The fixed parts of a swap between frontier columns a[i] and b[i]: flat positions of
+        their numbers in counts for every chain, their targets, which of b's numbers also
+        count a, and the constant delta shift from padded slots (see estimate).
+        """
+        pad, values, cell_constraints = problem["num_constraints"], problem["values"], problem["cell_constraints"]
+        ca, cb = cell_constraints[a], cell_constraints[b]
+        shared = ((cb[:, :, None] == ca[:, None, :]).any(axis=2) & (cb != pad)).astype(np.int8)
+        offset = (ca != pad).sum(axis=1) + (cb != pad).sum(axis=1) - 4 * ca.shape[1]
+        return (a, b, chain_base + ca, chain_base + cb, values[ca].astype(np.int8), values[cb].astype(np.int8),
+                shared, offset.astype(np.float32))
+
+    @staticmethod
+    def _swap(x, counts, swap, noise, betas):
+        """
+        Metropolis swap of the contents of frontier columns a[i] and b[i] in every chain.
+        No two pairs share a number, so all of them are decided at once.
+        """
+        a, b, index_a, index_b, target_a, target_b, shared, offset = swap
+        counts_flat = counts.reshape(-1)
+        xa = x[:, a]
+        differ = xa != x[:, b]
+        d = (1 - 2 * xa.view(np.int8))[..., None]              # change at a; b changes by -d
+        away = (d * (counts_flat[index_a] - target_a) >= 0).sum(axis=2, dtype=np.int8)
+        # b's numbers after the change at a
+        nb = counts_flat[index_b] + d * shared
+        away += (d * (target_b - nb) >= 0).sum(axis=2, dtype=np.int8)
+
+        accept = differ & (noise[:, a] > betas * (2 * away + offset))
+        x[:, a] ^= accept
+        x[:, b] ^= accept
+        change = accept[..., None] * d
+        counts_flat[index_a] += change
+        counts_flat[index_b] -= change
+        counts[:, -1] = 0
+
+    def _swap_classes(self, frontier):
+        """
+        For every swap offset, the (a, b) frontier column pairs it links, split into
+        classes in which no two pairs are counted by a common number.
+        """
+        column = np.full(self.width * self.height, -1, dtype=np.int64)
+        column[frontier] = np.arange(frontier.size)
+        rows, cols = np.divmod(frontier, self.width)
+
+        offsets = []
+        for dr, dc in self._swap_offsets:
+            nr, nc = rows + dr, cols + dc
+            inside = (nr >= 0) & (nr < self.height) & (nc >= 0) & (nc < self.width)
+            partner = np.full(frontier.size, -1)
+            partner[inside] = column[(nr * self.width + nc)[inside]]
+            a = np.flatnonzero(partner >= 0)
+            if a.size == 0:
+                continue
+            b = partner[a]
+            pr, pc = self._span[0] + abs(dr), self._span[1] + abs(dc)
+            colour = (rows[a] % pr) * pc + cols[a] % pc
+            offsets.append([(a[colour == k], b[colour == k]) for k in np.unique(colour)])
+        return offsets
+
+    def _build_problem(self, visible_state):
+        num_cells = self.width * self.height
+        flat = list(chain.from_iterable(visible_state))
+        # Numbers map to themselves, so the whole board is converted without a Python loop
+        numbers = np.fromiter(map(_CELL_CODES.get, flat, flat), dtype=np.int64, count=len(flat))
+        known = np.append(numbers == _CELL_CODES["M"], False)
+        is_hidden = np.append(numbers == _CELL_CODES[None], False)
+
+        revealed = np.flatnonzero(numbers >= 0)
+        neighbors = self._neighbors[revealed]
+        hidden_neighbors = is_hidden[neighbors]
+        values = numbers[revealed] - known[neighbors].sum(axis=1)
+        for impossible, problem in ((values > hidden_neighbors.sum(axis=1), "more mines than can fit around it"),
+                                    (values < 0, "fewer mines than are shown around it")):
+            if impossible.any():
+                raise ValueError(f"Cell {divmod(int(revealed[impossible][0]), self.width)} shows {problem}")
+        has_hidden = hidden_neighbors.any(axis=1)
+        revealed, neighbors, hidden_neighbors = revealed[has_hidden], neighbors[has_hidden], hidden_neighbors[has_hidden]
+        values = values[has_hidden]
+
+        frontier = np.unique(neighbors[hidden_neighbors])
+        column = np.full(num_cells + 1, frontier.size, dtype=np.int64)
+        column[frontier] = np.arange(frontier.size)
+        constraint_cells = np.where(hidden_neighbors, column[neighbors], frontier.size)
+
+        # Label components by spreading the smallest cell label through shared numbers
+        labels = np.arange(frontier.size + 1)
+        labels[-1] = frontier.size
+        in_use = constraint_cells < frontier.size
+        while True:
+            smallest = labels[constraint_cells].min(axis=1)
+            updated = labels.copy()
+            np.minimum.at(updated, constraint_cells[in_use], np.broadcast_to(smallest[:, None], in_use.shape)[in_use])
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        _, cell_component = np.unique(labels[:-1], return_inverse=True)
+
+        # Make components contiguous in both the frontier columns and the constraint rows
+        order = np.argsort(cell_component, kind="stable")
+        frontier, cell_component = frontier[order], cell_component[order]
+        position = np.append(np.argsort(order), frontier.size)
+        constraint_cells = position[constraint_cells]
+        constraint_component = cell_component[constraint_cells.min(axis=1)]
+        cons_order = np.argsort(constraint_component, kind="stable")
+        constraint_cells, values = constraint_cells[cons_order], values[cons_order]
+        constraint_component = constraint_component[cons_order]
+
+        # Reverse index: for every frontier cell, the constraints that count it
+        num_constraints = len(values)
+        pair_cells = constraint_cells.ravel()
+        pair_cons = np.repeat(np.arange(num_constraints), constraint_cells.shape[1])
+        keep = pair_cells < frontier.size
+        pair_cells, pair_cons = pair_cells[keep], pair_cons[keep]
+        pair_order = np.argsort(pair_cells, kind="stable")
+        pair_cells, pair_cons = pair_cells[pair_order], pair_cons[pair_order]
+        starts = np.searchsorted(pair_cells, np.arange(frontier.size))
+        rank = np.arange(len(pair_cells)) - starts[pair_cells]
+        cell_constraints = np.full((frontier.size, max(rank.max(initial=-1) + 1, 1)), num_constraints, dtype=np.int64)
+        cell_constraints[pair_cells, rank] = pair_cons
+
+        hidden = np.flatnonzero(is_hidden[:-1])
+        known_mines = np.flatnonzero(known[:-1])
+        if not 0 <= self.num_mines - known_mines.size <= hidden.size:
+            raise ValueError("No mine layout is consistent with the visible board")
+        num_components = int(cell_component.max(initial=-1)) + 1
+        return {
+            "frontier": frontier,
+            "hidden": hidden,
+            "known_mines": known_mines,
+            "interior_size": hidden.size - frontier.size,
+            "mines_left": self.num_mines - known_mines.size,
+            "constraint_cells": constraint_cells,
+            "cell_constraints": cell_constraints,
+            "num_constraints": num_constraints,
+            # A trailing 0 so padded constraint slots can be indexed
+            "values": np.append(values, 0),
+            "cell_component": cell_component,
+            "cell_starts": np.searchsorted(cell_component, np.arange(num_components)),
+            "constraint_component": constraint_component,
+            "constraint_starts": np.searchsorted(constraint_component, np.arange(num_components)),
+        }
+
+    def _warm_start(self, frontier, density):
+        """
+        Reuse the previous call's chains for cells still on the frontier; draw the rest.
+        """
+        x = self.rng.random((self.num_chains, frontier.size)) < density
+        if self._chains is not None:
+            _, new_idx, old_idx = np.intersect1d(frontier, self._chain_cells, return_indices=True)
+            x[:, new_idx] = self._chains[:, old_idx]
+        return x
+
+    def _seed_components(self, x, problem, max_nodes=20000):
+        """
+        For every component that no chain satisfies, search for one valid layout and give
+        it to the coldest chain; replica exchange passes it on to the others.
+        """
+        counts = self._constraint_counts(x, problem)
+        values = problem["values"]
+        violations = np.add.reduceat(np.abs(counts[:, :-1] - values[:-1]), problem["constraint_starts"], axis=1)
+        cons_ends = np.append(problem["constraint_starts"][1:], problem["num_constraints"])
+
+        for j in np.flatnonzero((violations != 0).all(axis=0)):
+            rows = range(problem["constraint_starts"][j], cons_ends[j])
+            constraints = [(problem["constraint_cells"][i], values[i]) for i in rows]
+            layout = _find_layout(constraints, problem["frontier"].size, self.rng, max_nodes)
+            if layout is not None:
+                cells = np.fromiter(layout, dtype=np.int64)
+                x[-1, cells] = np.fromiter(layout.values(), dtype=bool)
+
+    @staticmethod
+    def _constraint_counts(x, problem):
+        padded = np.concatenate([x, np.zeros((x.shape[0], 1), dtype=bool)], axis=1)
+        # C order, so estimate can update it through a flat view; the trailing column
+        # absorbs updates to padded constraint slots
+        counts = np.zeros((x.shape[0], problem["num_constraints"] + 1), dtype=np.int8)
+        counts[:, :-1] = padded[:, problem["constraint_cells"]].sum(axis=2)
+        return counts
+
+
+def _exact_counts(result):
+    """
+    The result of _enumerate_component as arrays: the mine counts k the component can
+    hold, the relative number of layouts with each, the board cells, and the relative
+    number of mines each cell holds over the layouts with each k. None stays None.
+    """
+    if result is None:
+        return None
+    weights, groups, group_mines = result
+    if not weights:
+        raise ValueError("No mine layout is consistent with the visible board")
+    mine_counts = np.fromiter(weights, dtype=np.int64)
+    most = max(weights.values())
+    ways = np.array([weights[k] / most for k in weights])
+    cells = np.fromiter((cell for group in groups for cell in group), dtype=np.int64)
+    mines = np.array([[group_mines[k][g] / (len(group) * most) for k in weights]
+                      for g, group in enumerate(groups) for _ in group]).reshape(cells.size, mine_counts.size)
+    return mine_counts, ways, cells, mines
+
+
+def _find_layout(constraints, pad, rng, max_nodes):
+    """
+    Depth-first search for one assignment of the constraints' cells that satisfies all of
+    them, trying mine / no mine in random order. Gives up after max_nodes assignments,
+    returning None; raises ValueError if the search ends before that, as then no
+    assignment exists.
+    """
+    cell_constraints = {}
+    for ci, (cells, _) in enumerate(constraints):
+        for cell in cells.tolist():
+            if cell != pad:
+                cell_constraints.setdefault(cell, []).append(ci)
+    order = list(cell_constraints)
+    need = [int(value) for _, value in constraints]
+    capacity = [int((cells != pad).sum()) for cells, _ in constraints]
+
+    # stack[i] holds the values still to try for order[i]; assigned[i] the current one
+    stack = [[True, False] if rng.random() < 0.5 else [False, True]]
+    assigned = []
+    for ci in cell_constraints[order[0]] if order else ():
+        capacity[ci] -= 1
+    nodes = 0
+    while stack:
+        if len(assigned) == len(order):
+            return dict(zip(order, assigned))
+        i = len(stack) - 1
+        cis = cell_constraints[order[i]]
+        if len(assigned) > i:
+            # Undo the previous choice for this cell before trying the next one
+            mine = assigned.pop()
+            for ci in cis:
+                need[ci] += mine
+        if not stack[-1] or nodes >= max_nodes:
+            stack.pop()
+            for ci in cis:
+                capacity[ci] += 1
+            continue
+        mine = stack[-1].pop(0)
+        nodes += 1
+        if all(0 <= need[ci] - mine <= capacity[ci] for ci in cis):
+            for ci in cis:
+                need[ci] -= mine
+            assigned.append(mine)
+            if len(assigned) < len(order):
+                stack.append([True, False] if rng.random() < 0.5 else [False, True])
+                for ci in cell_constraints[order[i + 1]]:
+                    capacity[ci] -= 1
+    if nodes < max_nodes:
+        raise ValueError("No mine layout is consistent with the visible board")
+    return None
+
+
+def _normalised(a):
+    return a / a.sum()
+
+
+if __name__ == "__main__":
+    from .game import GameSession
+    from .probability import MineProbabilityEngine
+
+    # Accuracy of sampling alone against the exact engine on a hard board, per time budget
+    game = GameSession(width=30, height=16, num_mines=99, seed=2)
+    for r, c in [(8, 15), (3, 4), (12, 25), (2, 27)]:
+        if game.board.board[r, c] != -1:
+            game.step("reveal", r, c)
+    state = game.get_state()["board"]
+    exact = MineProbabilityEngine(30, 16, 99).compute(state)
+    for budget in (0.01, 0.1, 0.5, 1.0):
+        errors, samples = [], []
+        for seed in range(5):
+            estimator = SampledProbabilityEstimator(30, 16, 99, exact_nodes=0, seed=seed)
+            errors.append(np.abs(estimator.estimate(state, time_budget=budget) - exact).max())
+            samples.append(estimator.last_num_samples)
+        print(f"30x16/99 sampled for {budget * 1e3:.0f} ms: median max abs error {np.median(errors):.3f}"
+              f" ({np.median(samples):.0f} samples)")
+
+    # Play 100x100 boards by always revealing the safest cell, with a 10 ms budget per move,
+    # checking against the exact engine every 20 moves
+    timings, sampled, errors = [], [], []
+    for seed in range(2):
+        game = GameSession(width=100, height=100, num_mines=1600, seed=seed)
+        zeros = np.argwhere(game.board.board == 0)
+        game.step("reveal", *map(int, zeros[len(zeros) // 2]))
+        estimator = SampledProbabilityEstimator(100, 100, 1600, seed=0)
+        engine = MineProbabilityEngine(100, 100, 1600)
+        while not game.is_game_over() and game.moves_made <= 100:
+            state = game.get_state()["board"]
+            start = time.perf_counter()
+            probabilities = estimator.estimate(state, time_budget=0.01)
+            timings.append(time.perf_counter() - start)
+            sampled.append(estimator._chains is not None)
+            if game.moves_made % 20 == 0:
+                errors.append(np.abs(probabilities - engine.compute(state)).max())
+            hidden = np.array([[not isinstance(v, int) for v in row] for row in state])
+            probabilities[~hidden] = 2.0
+            row, col = np.unravel_index(np.argmin(probabilities), probabilities.shape)
+            game.step("reveal", int(row), int(col))
+        print(f"100x100/1600 seed {seed}: {game.moves_made} moves, {game.get_num_revealed()} cells revealed")
+    print(f"median {np.median(timings) * 1e3:.1f} ms per call (90th percentile {np.percentile(timings, 90) * 1e3:.1f} ms),"
+          f" {1 - np.mean(sampled):.0%} of calls counted exactly,"
+          f" max abs error {np.round(errors, 3).tolist()}")
@@ -0,0 +1,231 @@
+# backend/solver.py
+
+from collections import deque
+from typing import List, Tuple
+
+import numpy as np
+from .board import MinesweeperBoard
+from .neighbors import get_neighbor_index
+from .utils import compute_adjacent_counts
+
+UNKNOWN, SAFE, MINE = 0, 1, 2
+
+
+class LogicalSolver:
+    """
+    Incremental Minesweeper deduction engine.
+
+    Every revealed number becomes a constraint "these unknown cells hold this many
+    mines". When a cell's status becomes known only the constraints around it are
+    updated and re-examined, so no deduction rescans the board. Rules applied:
+    - a constraint with 0 remaining mines, or as many mines as cells, decides all its cells;
+    - for two overlapping constraints where one's cells are a subset of the other's,
+      the difference holds the difference in mines;
+    - the global mine count, once all constraints are exhausted.
+    """
+
+    def __init__(self, width: int, height: int, num_mines: int = None, custom_mask: List[Tuple[int, int]] = None):
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        index = get_neighbor_index(width, height, custom_mask)
+        num_cells = index.num_cells
+        self._neighbors = index.lists           # cells counted by cell i's number
+        self._reverse = index.reverse_lists     # numbers that count cell i
+
+        self.status = [UNKNOWN] * num_cells
+        self.revealed = [False] * num_cells
+        self.unknown_count = num_cells
+        self.mines_found = 0
+
+        self._constraints = {}      # revealed cell -> [set of unknown cells, mines remaining among them]
+        self._dirty = deque()
+        self._new_safe = []
+        self._new_mines = []
+
+    def reveal(self, row: int, col: int, value: int):
+        """
+        Record that (row, col) was revealed showing `value` adjacent mines.
+        """
+        i = row * self.width + col
+        if self.revealed[i]:
+            return
+        self.revealed[i] = True
+        if self.status[i] == UNKNOWN:
+            self._set_status(i, SAFE, report=False)
+
+        unknown = set()
+        remaining = value
+        for j in self._neighbors[i]:
+            if self.status[j] == UNKNOWN:
+                unknown.add(j)
+            elif self.status[j] == MINE:
+                remaining -= 1
+        if unknown:
+            self._constraints[i] = [unknown, remaining]
+            self._dirty.append(i)
+
+    def mark_mine(self, row: int, col: int):
+        i = row * self.width + col
+        if self.status[i] == UNKNOWN:
+            self._set_status(i, MINE, report=False)
+
+    def solve(self) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """
+        Run deductions to a fixed point and return the cells newly proven (safe, mines)
+        since the last call. Safe cells still have to be revealed with reveal().
+        """
+        while True:
+            while self._dirty:
+                i = self._dirty.popleft()
+                if i in self._constraints:
+                    self._examine(i)
+            if not self._apply_global_count():
+                break
+
+        safe = [divmod(i, self.width) for i in self._new_safe]
+        mines = [divmod(i, self.width) for i in self._new_mines]
+        self._new_safe, self._new_mines = [], []
+        return safe, mines
+
+    def _examine(self, i):
+        unknown, remaining = self._constraints[i]
+        if remaining == 0:
+            for j in list(unknown):
+                self._set_status(j, SAFE)
+            return
+        if remaining == len(unknown):
+            for j in list(unknown):
+                self._set_status(j, MINE)
+            return
+
+        # Subset rule against constraints that share a cell with this one
+        others = {k for j in unknown for k in self._reverse[j] if k != i and k in self._constraints}
+        for k in others:
+            if i not in self._constraints:
+                return
+            if k not in self._constraints:
+                continue
+            unknown, remaining = self._constraints[i]
+            other, other_remaining = self._constraints[k]
+            if unknown <= other:
+                self._apply_difference(other - unknown, other_remaining - remaining)
+            elif other <= unknown:
+                self._apply_difference(unknown - other, remaining - other_remaining)
+
+    def _apply_difference(self, cells, mines):
+        if not cells:
+            return
+        if mines == 0:
+            for j in cells:
+                self._set_status(j, SAFE)
+        elif mines == len(cells):
+            for j in cells:
+                self._set_status(j, MINE)
+
+    def _apply_global_count(self):
+        """
+        Decide every unknown cell once the total mine count leaves no choice.
+        """
+        if self.num_mines is None or self.unknown_count == 0:
+            return False
+        mines_left = self.num_mines - self.mines_found
+        if mines_left == 0:
+            status = SAFE
+        elif mines_left == self.unknown_count:
+            status = MINE
+        else:
+            return False
+        for j, cell_status in enumerate(self.status):
+            if cell_status == UNKNOWN:
+                self._set_status(j, status)
+        return True
+
+    def _set_status(self, j, status, report=True):
+        if self.status[j] != UNKNOWN:
+            return
+        self.status[j] = status
+        self.unknown_count -= 1
+        if status == MINE:
+            self.mines_found += 1
+        if report:
+            (self._new_mines if status == MINE else self._new_safe).append(j)
+
+        for k in self._reverse[j]:
+            constraint = self._constraints.get(k)
+            if constraint is None or j not in constraint[0]:
+                continue
+            constraint[0].discard(j)
+            if status == MINE:
+                constraint[1] -= 1
+            if constraint[0]:
+                self._dirty.append(k)
+            else:
+                del self._constraints[k]
+
+
+def is_solvable_without_guessing(board_values: np.ndarray, start: Tuple[int, int],
+                                 custom_mask: List[Tuple[int, int]] = None) -> bool:
+    """
+    Check whether every safe cell of the board can be revealed by deduction alone,
+    starting from a click on `start`.
+    """
+    height, width = board_values.shape
+    values = board_values.tolist()
+    num_mines = int(np.count_nonzero(board_values == -1))
+    solver = LogicalSolver(width, height, num_mines=num_mines, custom_mask=custom_mask)
+
+    to_reveal = [start]
+    revealed = 0
+    while to_reveal:
+        for r, c in to_reveal:
+            solver.reveal(r, c, values[r][c])
+            revealed += 1
+        to_reveal, _ = solver.solve()
+    return revealed == width * height - num_mines
+
+
+def generate_no_guess_layout(width: int, height: int, num_mines: int, start: Tuple[int, int] = None,
+                             custom_mask: List[Tuple[int, int]] = None, seed: int = None,
+                             max_attempts: int = 100000) -> List[int]:
+    """
+    Sample mine layouts until one can be solved by pure deduction from a first click
+    on `start` (the board centre by default), and return its flat mine indices.
+    The start cell and, when room allows, its neighbours are kept free of mines so
+    the first click opens a region.
+    """
+    custom_mask = MinesweeperBoard.DEFAULT_NEIGHBORS if custom_mask is None else custom_mask
+    start = (height // 2, width // 2) if start is None else start
+    rng = np.random.default_rng(seed)
+
+    excluded = {start[0] * width + start[1]}
+    opening = set(get_neighbor_index(width, height, custom_mask).lists[start[0] * width + start[1]])
+    if width * height - len(excluded | opening) >= num_mines:
+        excluded |= opening
+    candidates = np.array([i for i in range(width * height) if i not in excluded])
+
+    for _ in range(max_attempts):
+        mine_indices = rng.choice(candidates, size=num_mines, replace=False)
+        mines = np.zeros(width * height, dtype=bool)
+        mines[mine_indices] = True
+        board_values = compute_adjacent_counts(mines.reshape(height, width), custom_mask)
+        if is_solvable_without_guessing(board_values, start, custom_mask):
+            return sorted(mine_indices.tolist())
+    raise RuntimeError(f"No guess-free layout found in {max_attempts} attempts")
+
+
+if __name__ == "__main__":
+    import time
+
+    difficulties = [
+        {"width": 8, "height": 8, "num_mines": 10, "label": "easy"},
+        {"width": 16, "height": 16, "num_mines": 40, "label": "medium"},
+        {"width": 30, "height": 16, "num_mines": 99, "label": "hard"},
+    ]
+    for setting in difficulties:
+        count = 20
+        start_time = time.perf_counter()
+        for i in range(count):
+            generate_no_guess_layout(setting["width"], setting["height"], setting["num_mines"], seed=i)
+        elapsed = time.perf_counter() - start_time
+        print(f"{setting['label']:<8} {count / elapsed:8.1f} boards/s")
@@ -3,6 +3,9 @@
 import random
 from typing import List, Tuple
 
+import numpy as np
+from .neighbors import get_neighbor_index
+
 
 def generate_random_positions(width: int, height: int, count: int, exclude: Tuple[int, int] = None, seed: int = None) -> List[Tuple[int, int]]:
     """
@@ -19,17 +22,32 @@ def generate_random_positions(width: int, height: int, count: int, exclude: Tupl
     return random.sample(all_coords, count)
 
 
-def get_neighbors(row: int, col: int, width: int, height: int) -> List[Tuple[int, int]]:
+def get_neighbors(row: int, col: int, width: int, height: int,
+                  custom_mask: List[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+    """
+    Return a list of valid neighboring coordinates for (row, col), 8-way unless a
+    custom_mask is given.
     """
-    Return a list of valid neighboring coordinates (8-way) for (row, col).
+    return list(get_neighbor_index(width, height, custom_mask).neighbors(row, col))
+
+
+def compute_adjacent_counts(mines: np.ndarray, custom_mask: List[Tuple[int, int]]) -> np.ndarray:
     """
-    neighbors = []
-    for dr in [-1, 0, 1]:
-        for dc in [-1, 0, 1]:
-            nr, nc = row + dr, col + dc
-            if (dr != 0 or dc != 0) and 0 <= nr < height and 0 <= nc < width:
-                neighbors.append((nr, nc))
-    return neighbors
+    Turn a bool mine grid of shape (..., height, width) into board values: -1 for
+    mines, otherwise the number of mines under the custom_mask offsets. Counts
+    are a sum of shifted copies of the mine grid, padded so that offsets falling
+    off the board count as empty.
+    """
+    height, width = mines.shape[-2:]
+    pad = max((max(abs(dr), abs(dc)) for dr, dc in custom_mask), default=0)
+    padding = [(0, 0)] * (mines.ndim - 2) + [(pad, pad), (pad, pad)]
+    padded = np.pad(mines, padding).astype(np.int16)
+
+    counts = np.zeros(mines.shape, dtype=np.int16)
+    for dr, dc in custom_mask:
+        counts += padded[..., pad + dr:pad + dr + height, pad + dc:pad + dc + width]
+
+    return np.where(mines, -1, counts).astype(np.int8)
 
 
 def print_board_debug(board: List[List[int]], revealed: List[List[bool]] = None, flags: List[List[bool]] = None):
@@ -0,0 +1,346 @@
+# benchmarks/suite.py
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+# Board configurations: the evaluate_multiple_difficulties settings plus very large boards
+CONFIGS = {
+    "easy": {"width": 8, "height": 8, "num_mines": 10},
+    "medium": {"width": 16, "height": 16, "num_mines": 40},
+    "hard": {"width": 30, "height": 16, "num_mines": 99},
+    "large": {"width": 100, "height": 100, "num_mines": 1600},
+    "huge": {"width": 1000, "height": 1000, "num_mines": 160000},
+}
+# huge takes minutes per benchmark, so it only runs when asked for
+DEFAULT_CONFIGS = ["easy", "medium", "hard", "large"]
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+
+
+def _timed_loop(run: Callable, min_time: float, setup: Callable = None) -> List[float]:
+    """
+    Call run(*setup()) until min_time seconds of timed calls have passed (at least
+    once) and return the duration of each call. setup() is not timed.
+    """
+    durations = []
+    while not durations or sum(durations) < min_time:
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        run(*args)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _result(durations: List[float], unit: str = "ops/s", per_call: float = 1, **extra) -> Dict:
+    """
+    Summarise call durations as a throughput (higher is better) plus latency percentiles.
+    """
+    durations = np.asarray(durations)
+    return {
+        "value": per_call * len(durations) / durations.sum(),
+        "unit": unit,
+        "higher_is_better": True,
+        "samples": len(durations),
+        "p50_ms": float(np.percentile(durations, 50) * 1e3),
+        "p95_ms": float(np.percentile(durations, 95) * 1e3),
+        **extra
+    }
+
+
+def _hidden_cell(board, rng):
+    hidden = np.flatnonzero(~board.revealed & ~board.flags)
+    return divmod(int(rng.choice(hidden)), board.width)
+
+
+def bench_board_construction(config: Dict, min_time: float) -> Dict:
+    from backend.board import MinesweeperBoard
+
+    seeds = itertools.count()
+    return _result(_timed_loop(lambda: MinesweeperBoard(**config, seed=next(seeds)), min_time), unit="boards/s")
+
+
+def bench_reveal_flood(config: Dict, min_time: float) -> Dict:
+    """
+    First click on a zero cell of a fresh board, so every call runs a flood fill.
+    """
+    from backend.board import MinesweeperBoard
+
+    seeds = itertools.count()
+    opened = []
+
+    def setup():
+        board = MinesweeperBoard(**config, seed=next(seeds))
+        zeros = np.argwhere(board.board == 0)
+        cell = zeros[0] if len(zeros) else np.argwhere(board.board != -1)[0]
+        return board, int(cell[0]), int(cell[1])
+
+    def run(board, row, col):
+        board.reveal(row, col)
+        opened.append(len(board.last_revealed))
+
+    durations = _timed_loop(run, min_time, setup)
+    return _result(durations, unit="reveals/s", cells_per_s=sum(opened) / sum(durations))
+
+
+def bench_game_step(config: Dict, min_time: float) -> Dict:
+    """
+    GameSession.step with random reveals of hidden cells, resetting finished games untimed.
+    """
+    from backend.game import GameSession
+
+    rng = np.random.default_rng(0)
+    game = GameSession(**config, seed=0)
+
+    def setup():
+        if game.is_game_over():
+            game.reset(seed=int(rng.integers(2**32)))
+        return _hidden_cell(game.board, rng)
+
+    return _result(_timed_loop(lambda row, col: game.step("reveal", row, col), min_time, setup), unit="steps/s")
+
+
+def bench_env_step(config: Dict, min_time: float) -> Dict:
+    from environment.minesweeper_env import MinesweeperEnv
+
+    rng = np.random.default_rng(0)
+    env = MinesweeperEnv(board_size=(config["width"], config["height"]), num_mines=config["num_mines"])
+    env.reset(seed=0)
+    state = {"done": False}
+
+    def setup():
+        if state["done"]:
+            env.reset()
+        row, col = _hidden_cell(env.game.board, rng)
+        return (np.array([col, row, 0]),)
+
+    def run(action):
+        state["done"] = env.step(action)[2]
+
+    return _result(_timed_loop(run, min_time, setup), unit="steps/s")
+
+
+def bench_env_reset(config: Dict, min_time: float) -> Dict:
+    from environment.minesweeper_env import MinesweeperEnv
+
+    env = MinesweeperEnv(board_size=(config["width"], config["height"]), num_mines=config["num_mines"])
+    env.reset(seed=0)
+    return _result(_timed_loop(env.reset, min_time), unit="resets/s")
+
+
+def bench_vector_env_step(config: Dict, min_time: float, num_envs: int = 64) -> Dict:
+    from environment.minesweeper_vector_env import MinesweeperVectorEnv
+
+    envs = MinesweeperVectorEnv(num_envs=num_envs, board_size=(config["width"], config["height"]),
+                                num_mines=config["num_mines"], seed=0)
+    envs.reset()
+    envs.action_space.seed(0)
+    durations = _timed_loop(envs.step, min_time, lambda: (envs.action_space.sample(),))
+    return _result(durations, unit="env_steps/s", per_call=num_envs, num_envs=num_envs)
+
+
+def bench_evaluate_agent(config: Dict, min_time: float, episodes_per_call: int = 10) -> Dict:
+    from evaluation.evaluate import evaluate_agent
+    from models.random_agent.agent import RandomAgent
+
+    seeds = itertools.count()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            evaluate_agent(RandomAgent, num_episodes=episodes_per_call, **config, seed=next(seeds) * episodes_per_call)
+
+    return _result(_timed_loop(run, min_time), unit="episodes/s", per_call=episodes_per_call)
+
+
+def _bench_api_step(config: Dict, min_time: float, delta: bool) -> Dict:
+    """
+    Latency of /api/step through Flask's test client, which runs the full request
+    handling (routing, JSON, session lock) without a network socket.
+    """
+    import frontend.api as api
+    from frontend.app import app
+
+    client = app.test_client()
+    rng = np.random.default_rng(0)
+    session = {"id": None, "over": False}
+
+    def setup():
+        if session["id"] is None or session["over"]:
+            session["id"] = client.post("/api/new_game", json=config).get_json()["session_id"]
+        with api.session_store.acquire(session["id"]) as game:
+            row, col = _hidden_cell(game.board, rng)
+            payload = {"action": "reveal", "row": row, "col": col, "session_id": session["id"]}
+            if delta:
+                payload.update(delta=True, version=game.version)
+        return (payload,)
+
+    def run(payload):
+        response = client.post("/api/step", json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/step failed: {response.get_data(as_text=True)}")
+        with api.session_store.acquire(session["id"]) as game:
+            session["over"] = game.is_game_over()
+
+    result = _result(_timed_loop(run, min_time, setup), unit="ms")
+    # Latency is the figure of merit for the API
+    result.update(value=result["p50_ms"], higher_is_better=False, throughput=result["value"])
+    return result
+
+
+def bench_api_step(config: Dict, min_time: float) -> Dict:
+    return _bench_api_step(config, min_time, delta=False)
+
+
+def bench_api_step_delta(config: Dict, min_time: float) -> Dict:
+    return _bench_api_step(config, min_time, delta=True)
+
+
+BENCHMARKS = {
+    "board_construction": bench_board_construction,
+    "reveal_flood": bench_reveal_flood,
+    "game_step": bench_game_step,
+    "env_step": bench_env_step,
+    "env_reset": bench_env_reset,
+    "vector_env_step": bench_vector_env_step,
+    "evaluate_agent": bench_evaluate_agent,
+    "api_step": bench_api_step,
+    "api_step_delta": bench_api_step_delta,
+}
+
+
+def _metadata() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=BENCHMARKS_DIR, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _median_result(runs: List[Dict]) -> Dict:
+    """
+    Merge repeated runs of one benchmark: the run with the median value, with "values"
+    listing every run's value and "samples" counting the timed calls of all runs.
+    """
+    values = [run["value"] for run in runs]
+    result = dict(sorted(runs, key=lambda run: run["value"])[(len(runs) - 1) // 2])
+    result.update(value=float(np.median(values)), values=values, samples=sum(run["samples"] for run in runs))
+    return result
+
+
+def run_benchmarks(benchmarks: List[str] = None, configs: List[str] = None, min_time: float = 0.2,
+                   repeats: int = 5, verbose: bool = True) -> Dict:
+    """
+    Run the selected benchmarks (all by default) on the selected configs (all but huge
+    by default) and return {"meta": ..., "results": {"<benchmark>[<config>]": {...}}}.
+    Each benchmark runs repeats times for min_time seconds; its result has the median
+    "value" in "unit" and whether higher is better, plus p50/p95 call latency.
+    """
+    results = {}
+    for name in benchmarks or BENCHMARKS:
+        for label in configs or DEFAULT_CONFIGS:
+            key = f"{name}[{label}]"
+            results[key] = _median_result([BENCHMARKS[name](CONFIGS[label], min_time) for _ in range(repeats)])
+            if verbose:
+                values = results[key]["values"]
+                print(f"{key:<32} {results[key]['value']:>12.2f} {results[key]['unit']}"
+                      f"  (range {min(values):.2f}-{max(values):.2f}, {results[key]['samples']} calls)")
+    return {"meta": _metadata(), "results": results}
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float = 0.2, min_samples: int = 5) -> List[Dict]:
+    """
+    Compare two run_benchmarks outputs. A result is a regression when it is worse
+    than the baseline by more than `tolerance` (a fraction), and an improvement
+    when it is better by more than that. Results from fewer than min_samples timed
+    calls on either side are reported as "too few samples" instead.
+    """
+    rows = []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            rows.append({"benchmark": key, "current": result["value"], "baseline": None, "change": None, "status": "new"})
+            continue
+        change = result["value"] / base["value"] - 1
+        # Positive speedup means better, whichever direction the metric runs
+        speedup = change if result["higher_is_better"] else -change
+        status = "regression" if speedup < -tolerance else "improvement" if speedup > tolerance else "ok"
+        if min(result.get("samples", 0), base.get("samples", 0)) < min_samples:
+            status = "too few samples"
+        rows.append({"benchmark": key, "current": result["value"], "baseline": base["value"], "change": change,
+                     "status": status})
+    return rows
+
+
+def _print_comparison(rows: List[Dict], baseline: Dict, current: Dict):
+    if baseline["meta"].get("platform") != current["meta"].get("platform") or \
+            baseline["meta"].get("cpu_count") != current["meta"].get("cpu_count"):
+        print("Warning: the baseline was recorded on a different machine; differences may not be regressions")
+    print(f"\n{'benchmark':<32} {'baseline':>12} {'current':>12} {'change':>8}  status")
+    for row in rows:
+        baseline_value = f"{row['baseline']:.2f}" if row["baseline"] is not None else "-"
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+        print(f"{row['benchmark']:<32} {baseline_value:>12} {row['current']:>12.2f} {change:>8}  {row['status']}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Minesweeper engine, envs, evaluation and API.")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS),
+                        help=f"board configs to run (default: {' '.join(DEFAULT_CONFIGS)})")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds of timed calls per repeat")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per benchmark; the median is compared")
+    parser.add_argument("--min-samples", type=int, default=5,
+                        help="timed calls a result needs to count as a regression")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the results as JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.benchmarks, args.configs, args.min_time, args.repeats)
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare_results(current, baseline, args.tolerance, args.min_samples)
+    _print_comparison(rows, baseline, current)
+    regressions = [row["benchmark"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,12 @@
 from gymnasium.envs.registration import register
 from .minesweeper_env import MinesweeperEnv
+from .minesweeper_vector_env import MinesweeperVectorEnv
+from .shared_memory_vector_env import SharedMemoryVectorEnv
 
 register(
     id='Minesweeper-v0',
     entry_point='environment.minesweeper_env:MinesweeperEnv',
+    vector_entry_point='environment.minesweeper_vector_env:MinesweeperVectorEnv',
 )
 
-__all__ = ['MinesweeperEnv']
+__all__ = ['MinesweeperEnv', 'MinesweeperVectorEnv', 'SharedMemoryVectorEnv']
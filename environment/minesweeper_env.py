@@ -1,30 +1,49 @@
 import gymnasium as gym
 from gymnasium import spaces
-from gymnasium.utils.env_checker import check_env
+from backend import metrics
+from backend.board_bank import BoardBank
 from backend.game import GameSession
+from environment.rendering import SPRITE_NAMES, FrameWriter, compose_frames, load_sprite_atlas, sprite_codes
 import numpy as np
-import pygame
+import time
 from os import path
-import os
-import glob
 
 class MinesweeperEnv(gym.Env):
-    metadata = {"render_modes": ["human"], 'render_fps': 4}
+    metadata = {"render_modes": ["human", "rgb_array"], 'render_fps': 4}
 
-    def __init__(self, board_size=(6, 6), num_mines=5, custom_mask=None, render_mode=None, seed=None, fps=None):
+    # Reward constants (also used by MinesweeperVectorEnv)
+    step_efficiency_bonus = 0.5
+    R_win = 10.0
+    R_mine_hit = -10.0
+    R_safe_reveal = 3
+    step_penalty = -0.5
+    exceed_flags = -20.0
+    false_flag_penalty = -1
+
+    def __init__(self, board_size=(6, 6), num_mines=5, custom_mask=None, render_mode=None, seed=None, fps=None,
+                 board_bank=None, frames_dir="frames", cell_size=40):
         super().__init__()
         self.board_width, self.board_height = board_size
         self.num_mines = num_mines
         self.render_mode = render_mode
 
+        # fps=0 renders without throttling. Rendered frames are saved as PNGs in frames_dir,
+        # streamed into one array file if it ends in ".npy", or not saved if it is None
         self.fps = fps if fps is not None else self.metadata['render_fps']
+        self.frames_dir = frames_dir
+        self.cell_size = (cell_size, cell_size)  # pixels per cell in both render modes
+
+        # A board bank (BoardBank or path to one) makes resets pick pregenerated boards
+        if isinstance(board_bank, str):
+            board_bank = BoardBank(board_bank)
 
         self.game = GameSession(
             width=self.board_width,
             height=self.board_height,
             num_mines=self.num_mines,
             custom_mask=custom_mask,
-            seed=seed
+            seed=seed,
+            board_bank=board_bank
         )
 
         self.action_space = spaces.MultiDiscrete([self.board_width, self.board_height, 2])
@@ -45,65 +64,67 @@ class MinesweeperEnv(gym.Env):
         })
 
         self.max_possible_moves = self.board_width * self.board_height - self.num_mines
-        self.step_efficiency_bonus = 0.5
-        self.R_win = 10.0
-        self.R_mine_hit = -10.0
-        self.R_safe_reveal = 3
-        self.step_penalty = -0.5
-        self.exceed_flags = -20.0
-        self.false_flag_penalty = -1
         self.moves_taken = 0
         self._episode_count = 0
         self.num_current_flags = 0
 
+        # The encoded board is kept up to date cell by cell instead of being rebuilt every step
+        self._visibility_mask = np.array(self.game.custom_mask)
+        self._encoded_board = np.full((self.board_height, self.board_width), -3, dtype=int)
+
         if self.render_mode == "human":
             self._init_pygame()
+        elif self.render_mode == "rgb_array":
+            self._sprite_atlas = load_sprite_atlas(cell_size)
 
     def _init_pygame(self):
+        # pygame is only imported once a human render needs it, keeping env imports light
+        import pygame
+
         pygame.init()
         pygame.display.init()
         pygame.display.set_caption("Minesweeper")
-        self.cell_size = (40, 40)
-        self.screen = pygame.display.set_mode((self.board_width * 40, self.board_height * 40))
+        self.screen = pygame.display.set_mode((self.board_width * self.cell_size[0], self.board_height * self.cell_size[1]))
         self.clock = pygame.time.Clock()
-        
-        # Create a dictionary to store all sprite images
-        self.sprites = {}
-        
-        # Get path to the sprites directory
+
+        # Load every sprite, scaled to cell size, in sprite code order
         sprites_dir = path.join(path.dirname(__file__), "sprites")
-        
-        # Find all PNG files in the sprites directory
-        png_files = glob.glob(path.join(sprites_dir, "*.png"))
-        
-        # Load each sprite and scale it to cell size
-        for png_file in png_files:
-            # Extract the filename without extension to use as the key
-            filename = path.basename(png_file)
-            sprite_name = path.splitext(filename)[0]
-            
-            # Load and scale the image
-            img = pygame.image.load(png_file)
-            scaled_img = pygame.transform.scale(img, self.cell_size)
-            
-            # Store in the sprites dictionary
-            self.sprites[sprite_name] = scaled_img
+        self.sprites = {
+            name: pygame.transform.scale(pygame.image.load(path.join(sprites_dir, name + ".png")), self.cell_size)
+            for name in SPRITE_NAMES
+        }
+        self._sprite_list = [self.sprites[name] for name in SPRITE_NAMES]
+
+        # Sprite codes currently on screen; -1 forces the first frame to draw every cell
+        self._drawn_codes = np.full((self.board_height, self.board_width), -1)
+        self._frame_writer = FrameWriter(self.frames_dir) if self.frames_dir is not None else None
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
 
-        self.game.reset()
+        if self.game.board_bank is not None:
+            # Pregenerated board: options={"bank_index": i} picks one, otherwise drawn from the env's RNG
+            bank_index = (options or {}).get("bank_index")
+            if bank_index is None:
+                bank_index = int(self.np_random.integers(len(self.game.board_bank)))
+            self.game.reset(bank_index=bank_index)
+        else:
+            # A board seed given to the constructor keeps every episode on the same layout;
+            # otherwise layouts come from the env's RNG so that reset(seed=...) is reproducible
+            board_seed = None if self.game.seed is not None else int(self.np_random.integers(2**32))
+            self.game.reset(seed=board_seed)
         self.moves_taken = 0
         self._episode_count += 1 # Increment episode count
         self.num_current_flags = 0
         if self.render_mode == "human":
             self._frame_count = 0
 
+        self._encode_full_board()
         obs = {
             "board": self.get_encoded_board(),
-            "visibility_mask": np.array(self.game.custom_mask),
-            "num_mines": self.game.get_state()["num_mines"],
-            "game_over": int(self.game.get_state()["game_over"])
+            "visibility_mask": self._visibility_mask,
+            "num_mines": self.game.num_mines,
+            "game_over": int(self.game.is_game_over())
         }
 
         info = {"episode": self._episode_count} # Add episode to info
@@ -113,33 +134,36 @@ class MinesweeperEnv(gym.Env):
         return obs, info
     
     def step(self, action):
+        start = time.perf_counter() if metrics.enabled else None
         col, row = action[0:2]
         action_type = action[2]
         action_str = "reveal" if action_type == 0 else "flag"
-        result = self.game.step(action_str, row, col)
+        applied = self.game.apply_action(action_str, row, col)
         if action_str == "reveal":
             self.moves_taken += 1
         else:
             self.num_current_flags += 1
 
+        if applied:
+            self._update_encoded_board(action_str, row, col)
+
         obs = {
             "board": self.get_encoded_board(),
-            "visibility_mask": np.array(self.game.custom_mask),
-            "num_mines": result["num_mines"],
-            "game_over": int(result["game_over"])
+            "visibility_mask": self._visibility_mask,
+            "num_mines": self.game.num_mines,
+            "game_over": int(self.game.is_game_over())
         }
 
         terminated = bool(obs["game_over"]) # Initial termination status from win/mine_hit
 
         game_state_for_reward = ""
         if terminated:
-            if result["won"]:
+            if self.game.is_win():
                 game_state_for_reward = "win"
             else:
                 game_state_for_reward = "mine_hit"
         else:
-            encoded_board = obs["board"]
-            if not np.any(encoded_board == -3):
+            if self.game.get_num_hidden() == 0:
                 # All cells are revealed or flagged. Since not a win/mine_hit yet, only move is unflagging which is considered non-ideal
                 terminated = True
                 obs["game_over"] = 1
@@ -158,63 +182,90 @@ class MinesweeperEnv(gym.Env):
         if self.render_mode == "human":
             info['frame'] = self._frame_count # Add frame to info if rendering
             self.render()
-            
+
+        if start is not None:
+            metrics.record_env_step(time.perf_counter() - start)
         return obs, reward, terminated, False, info
 
     def render(self):
-        for r in range(self.board_height):
-            for c in range(self.board_width):
-                board = self.game.get_state()["board"]
-                cell_value = board[r][c]
-                if cell_value is None:
-                    sprite = self.sprites["cellup"]
-                elif cell_value == "F":
-                    sprite = self.sprites["cellflag"]
-                elif cell_value == "*":
-                    sprite = self.sprites["blast"]
-                elif cell_value == "X":
-                    sprite = self.sprites["falsemine"]
-                elif cell_value == "M":
-                    sprite = self.sprites["cellmine"]
-                else:
-                    sprite = self.sprites["cell" + str(cell_value)]
-                self.screen.blit(sprite, (c * 40, r * 40))
-        pygame.display.flip()
-        if not os.path.exists("frames"):
-            os.makedirs("frames")
+        """
+        In "rgb_array" mode, return the board as a (height, width, 3) uint8 frame.
+        In "human" mode, draw the cells whose sprite changed since the last frame,
+        then queue the frame for saving on the background writer.
+        """
+        board = self.game.board
+        codes = sprite_codes(self._encoded_board, board.revealed & (board.board == -1))
+        if self.render_mode == "rgb_array":
+            return compose_frames(codes, self._sprite_atlas)
+
+        import pygame
+
+        cell_width, cell_height = self.cell_size
+        dirty = np.argwhere(codes != self._drawn_codes)
+        rects = []
+        for r, c in dirty.tolist():
+            rects.append(self.screen.blit(self._sprite_list[codes[r, c]], (c * cell_width, r * cell_height)))
+        self._drawn_codes = codes
+        pygame.display.update(rects)
+
         frame_count = getattr(self, '_frame_count', 0) # Keep track of frames
-        pygame.image.save(self.screen, f"frames/episode_{self._episode_count:03d}_frame_{frame_count:04d}.png")
+        if self._frame_writer is not None:
+            self._frame_writer.write(self.screen, f"episode_{self._episode_count:03d}_frame_{frame_count:04d}.png")
         self._frame_count = frame_count + 1
-        self.clock.tick(self.fps)  
+        self.clock.tick(self.fps)
 
         return None
 
+    def close(self):
+        if getattr(self, "_frame_writer", None) is not None:
+            self._frame_writer.close()
+            self._frame_writer = None
+        if self.render_mode == "human":
+            import pygame
+
+            pygame.display.quit()
+        super().close()
+
     def get_encoded_board(self):
         """
         Encode the board state into a format suitable for the observation space.
+        Returns a copy of the incrementally maintained encoding.
         """
-        board = self.game.get_state()["board"]
-        encoded_board = []
-
-        for row in board:
-            encoded_row = []
-            for cell in row:
-                if cell is None:
-                    encoded_row.append(-3)  # Unrevealed
-                elif cell == "F":
-                    encoded_row.append(-2)  # Flagged
-                elif cell == "*":
-                    encoded_row.append(-1)
-                elif cell == "M":
-                    encoded_row.append(-1)  # Mine when game over
-                elif cell == "X":
-                    encoded_row.append(-4)  # Incorrectly flagged non-mine, revealed when game over
-                else:
-                    encoded_row.append(cell)
-
-            encoded_board.append(encoded_row)
-
-        return np.array(encoded_board)
+        return self._encoded_board.copy()
+
+    def _encode_full_board(self):
+        """
+        Rebuild the whole encoding from the game. Only needed on reset and once at game over.
+        """
+        board = self.game.board
+        encoded = np.where(board.revealed, board.board, -3)
+        encoded[board.flags] = -2  # Flagged
+
+        if self.game.is_game_over():
+            mines = board.board == -1
+            if self.game.is_win():
+                encoded[mines] = -2  # All mines shown as flagged
+            else:
+                encoded[mines & ~board.flags] = -1  # Exploded and unflagged mines
+            encoded[board.flags & ~mines] = -4  # Incorrectly flagged non-mine, revealed when game over
+
+        self._encoded_board[:] = encoded
+
+    def _update_encoded_board(self, action_str, row, col):
+        """
+        Patch the encoding at the cells changed by the last action.
+        """
+        if self.game.is_game_over():
+            self._encode_full_board()
+            return
+
+        board = self.game.board
+        if action_str == "reveal":
+            if board.last_revealed:
+                rows, cols = zip(*board.last_revealed)
+                self._encoded_board[rows, cols] = board.board[rows, cols]
+        elif board.is_valid_coord(row, col) and not board.is_revealed(row, col):
+            self._encoded_board[row, col] = -2 if board.is_flagged(row, col) else -3
 
     def is_valid_action(self, action):
         """
@@ -234,8 +285,7 @@ class MinesweeperEnv(gym.Env):
             efficiency_bonus = (self.max_possible_moves - self.moves_taken) * self.step_efficiency_bonus
             return self.R_win + efficiency_bonus
         elif game_state == "mine_hit":
-            board = self.get_encoded_board()
-            num_false_flags = np.count_nonzero(board == -4)
+            num_false_flags = self.game.get_num_false_flags()
             # Penalty for hitting a mine
             return self.R_mine_hit + self.false_flag_penalty * num_false_flags
         elif game_state == "all_touched_not_won": # all cells acted upon, but not a win
@@ -257,6 +307,8 @@ class MinesweeperEnv(gym.Env):
         return action
 
 if __name__ == "__main__":
+    from gymnasium.utils.env_checker import check_env
+
     env = gym.make("Minesweeper-v0", render_mode="human", seed=42, fps=10, num_mines=15, board_size=(20, 6))
     print("Start environment check")
     check_env(env.unwrapped)
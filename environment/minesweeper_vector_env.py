@@ -0,0 +1,247 @@
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.utils import seeding
+from gymnasium.vector.utils import batch_space
+from backend.board import MinesweeperBoard
+from backend.neighbors import get_neighbor_index
+from backend.utils import compute_adjacent_counts
+from .minesweeper_env import MinesweeperEnv
+from .rendering import compose_frames, load_sprite_atlas, sprite_codes
+
+
+class MinesweeperVectorEnv(VectorEnv):
+    """
+    N Minesweeper boards stepped together in one process.
+
+    All boards are held as stacked (num_envs, height, width) arrays and every
+    reveal, flood fill, flag, reward and reset is applied to the whole batch
+    with NumPy operations. Observations, actions and rewards follow
+    MinesweeperEnv, so agents can switch between the two.
+
+    Finished boards are reset on the following step (gymnasium's NEXT_STEP
+    autoreset): that step ignores their action and returns reward 0.
+
+    With render_mode="rgb_array", render() returns every board as one
+    (num_envs, height * cell_size, width * cell_size, 3) uint8 array.
+    """
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP, "render_modes": ["rgb_array"]}
+
+    step_efficiency_bonus = MinesweeperEnv.step_efficiency_bonus
+    R_win = MinesweeperEnv.R_win
+    R_mine_hit = MinesweeperEnv.R_mine_hit
+    R_safe_reveal = MinesweeperEnv.R_safe_reveal
+    step_penalty = MinesweeperEnv.step_penalty
+    exceed_flags = MinesweeperEnv.exceed_flags
+    false_flag_penalty = MinesweeperEnv.false_flag_penalty
+
+    def __init__(self, num_envs=8, board_size=(6, 6), num_mines=5, custom_mask=None, seed=None,
+                 render_mode=None, cell_size=40):
+        super().__init__()
+        self.num_envs = num_envs
+        self.render_mode = render_mode
+        self.board_width, self.board_height = board_size
+        self.num_mines = num_mines
+        self.custom_mask = MinesweeperBoard.DEFAULT_NEIGHBORS if custom_mask is None else custom_mask
+
+        self.single_action_space = spaces.MultiDiscrete([self.board_width, self.board_height, 2])
+        self.single_observation_space = spaces.Dict({
+            "board": spaces.Box(low=-4, high=8, shape=(self.board_height, self.board_width), dtype=int),
+            "visibility_mask": spaces.Box(low=-1, high=1, shape=(8, 2), dtype=int),
+            "num_mines": spaces.Discrete(self.num_mines + 1),
+            "game_over": spaces.Discrete(2)
+        })
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+        self.max_possible_moves = self.board_width * self.board_height - self.num_mines
+        self._pad = max((max(abs(dr), abs(dc)) for dr, dc in self.custom_mask), default=0)
+        self.neighbor_index = get_neighbor_index(self.board_width, self.board_height, self.custom_mask)
+        self._visibility_mask = np.broadcast_to(np.array(self.custom_mask), (num_envs, len(self.custom_mask), 2))
+
+        shape = (num_envs, self.board_height, self.board_width)
+        self.mines = np.zeros(shape, dtype=bool)
+        self.counts = np.zeros(shape, dtype=np.int8)    # -1 = mine, otherwise adjacent mine count
+        self.revealed = np.zeros(shape, dtype=bool)
+        self.flags = np.zeros(shape, dtype=bool)
+        self.game_over = np.zeros(num_envs, dtype=bool)
+        self.won = np.zeros(num_envs, dtype=bool)
+        self.moves_taken = np.zeros(num_envs, dtype=np.int64)
+        self.num_current_flags = np.zeros(num_envs, dtype=np.int64)
+        self._autoreset = np.zeros(num_envs, dtype=bool)
+
+        if seed is not None:
+            self._np_random, self._np_random_seed = seeding.np_random(seed)
+        if render_mode == "rgb_array":
+            self._sprite_atlas = load_sprite_atlas(cell_size)
+        elif render_mode is not None:
+            raise ValueError(f"Unsupported render_mode {render_mode!r}, expected one of {self.metadata['render_modes']}")
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        self._reset_boards(np.arange(self.num_envs))
+        self._autoreset[:] = False
+        return self._get_obs(np.zeros(self.num_envs, dtype=bool)), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+
+        # Boards that finished on the previous step are reset and skip this action
+        resetting = np.flatnonzero(self._autoreset)
+        if resetting.size:
+            self._reset_boards(resetting)
+        active = ~self._autoreset
+
+        cols, rows, action_types = actions[:, 0], actions[:, 1], actions[:, 2]
+        is_reveal = active & (action_types == 0)
+        is_flag = active & (action_types != 0)
+
+        self._apply_reveals(np.flatnonzero(is_reveal), rows, cols)
+        self._apply_flags(np.flatnonzero(is_flag), rows, cols)
+        self.moves_taken += is_reveal
+        self.num_current_flags += is_flag
+
+        hidden = self.board_height * self.board_width - self.revealed.sum(axis=(1, 2)) - self.flags.sum(axis=(1, 2))
+        lost = active & self.game_over & ~self.won
+        won = active & self.won
+        all_touched = active & ~self.game_over & (hidden == 0)
+        exceeded = active & (self.num_current_flags > self.num_mines)
+
+        rewards[is_reveal] = self.R_safe_reveal + self.step_penalty
+        rewards[is_flag] = 0
+        rewards[all_touched] = -1.0
+        rewards[won] = self.R_win + (self.max_possible_moves - self.moves_taken[won]) * self.step_efficiency_bonus
+        if lost.any():
+            false_flags = (self.flags[lost] & ~self.mines[lost]).sum(axis=(1, 2))
+            rewards[lost] = self.R_mine_hit + self.false_flag_penalty * false_flags
+        rewards[exceeded] = self.exceed_flags
+
+        terminated = active & (self.game_over | all_touched | exceeded)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        obs = self._get_obs(all_touched)
+
+        self._autoreset = terminated.copy()
+        return obs, rewards, terminated, truncated, {}
+
+    def _reset_boards(self, env_ids):
+        """
+        Sample fresh mine layouts for env_ids and clear their game state.
+        """
+        n = len(env_ids)
+        num_cells = self.board_height * self.board_width
+        # The num_mines smallest of num_cells uniform keys give a uniform sample without replacement
+        keys = self.np_random.random((n, num_cells))
+        mine_cells = np.argpartition(keys, self.num_mines - 1, axis=1)[:, :self.num_mines] if self.num_mines else None
+
+        mines = np.zeros((n, num_cells), dtype=bool)
+        if mine_cells is not None:
+            np.put_along_axis(mines, mine_cells, True, axis=1)
+        mines = mines.reshape(n, self.board_height, self.board_width)
+
+        self.mines[env_ids] = mines
+        self.counts[env_ids] = compute_adjacent_counts(mines, self.custom_mask)
+        self.revealed[env_ids] = False
+        self.flags[env_ids] = False
+        self.game_over[env_ids] = False
+        self.won[env_ids] = False
+        self.moves_taken[env_ids] = 0
+        self.num_current_flags[env_ids] = 0
+
+    def _apply_reveals(self, env_ids, rows, cols):
+        if env_ids.size == 0:
+            return
+        r, c = rows[env_ids], cols[env_ids]
+        num_cells = self.board_height * self.board_width
+        # Flat seeds with a trailing column that absorbs the index's off-board padding
+        seeds = np.zeros((env_ids.size, num_cells + 1), dtype=bool)
+        local = np.arange(env_ids.size)
+
+        # Normal reveal of a hidden, unflagged cell
+        hidden = ~self.revealed[env_ids, r, c] & ~self.flags[env_ids, r, c]
+        seeds[local[hidden], (r * self.board_width + c)[hidden]] = True
+
+        # Mass reveal of a revealed number whose flagged neighbours match its count
+        chord = self.revealed[env_ids, r, c] & (self.counts[env_ids, r, c] > 0)
+        if chord.any():
+            chord_ids = np.flatnonzero(chord)
+            neighbours = self.neighbor_index.table[r[chord_ids] * self.board_width + c[chord_ids]]
+            flags = np.zeros((chord_ids.size, num_cells + 1), dtype=bool)
+            flags[:, :-1] = self.flags[env_ids[chord_ids]].reshape(chord_ids.size, -1)
+            flagged = np.take_along_axis(flags, neighbours, axis=1).sum(axis=1)
+            matched = flagged == self.counts[env_ids[chord_ids], r[chord_ids], c[chord_ids]]
+            seeds[chord_ids[matched, None], neighbours[matched]] = True
+        seeds = seeds[:, :-1].reshape(env_ids.size, self.board_height, self.board_width)
+
+        revealed = self.revealed[env_ids]
+        flags = self.flags[env_ids]
+        newly = seeds & ~revealed & ~flags
+        hit_mine = (newly & self.mines[env_ids]).any(axis=(1, 2))
+        revealed |= newly
+
+        # Flood fill: grow every board's zero regions one mask step at a time
+        zeros = self.counts[env_ids] == 0
+        frontier = newly & zeros
+        while frontier.any():
+            newly = self._spread(frontier) & ~revealed & ~flags
+            revealed |= newly
+            frontier = newly & zeros
+        self.revealed[env_ids] = revealed
+
+        safe_revealed = (revealed & ~self.mines[env_ids]).sum(axis=(1, 2))
+        won = ~hit_mine & (safe_revealed == self.max_possible_moves)
+        self.game_over[env_ids] = hit_mine | won
+        self.won[env_ids] = won
+
+    def _apply_flags(self, env_ids, rows, cols):
+        if env_ids.size == 0:
+            return
+        r, c = rows[env_ids], cols[env_ids]
+        can_flag = ~self.revealed[env_ids, r, c]
+        env_ids, r, c = env_ids[can_flag], r[can_flag], c[can_flag]
+        self.flags[env_ids, r, c] = ~self.flags[env_ids, r, c]
+
+    def _spread(self, grid):
+        """
+        Mark every cell p + offset reached from a set cell p, for all custom_mask offsets.
+        """
+        p = self._pad
+        h, w = self.board_height, self.board_width
+        padded = np.pad(grid, ((0, 0), (p, p), (p, p)))
+        spread = np.zeros(grid.shape, dtype=bool)
+        for dr, dc in self.custom_mask:
+            spread |= padded[:, p - dr:p - dr + h, p - dc:p - dc + w]
+        return spread
+
+    def render(self):
+        """
+        Draw every board from the sprite atlas in one gather.
+        """
+        if self.render_mode != "rgb_array":
+            return None
+        codes = sprite_codes(self._encode_boards(), self.revealed & self.mines)
+        return compose_frames(codes, self._sprite_atlas)
+
+    def _get_obs(self, all_touched):
+        return {
+            "board": self._encode_boards(),
+            "visibility_mask": self._visibility_mask.copy(),
+            "num_mines": np.full(self.num_envs, self.num_mines, dtype=np.int64),
+            "game_over": (self.game_over | all_touched).astype(np.int64)
+        }
+
+    def _encode_boards(self):
+        """
+        Encode every board the same way as MinesweeperEnv.get_encoded_board.
+        """
+        board = np.where(self.revealed, self.counts, -3).astype(int)
+        board[self.flags] = -2
+
+        over = self.game_over
+        if over.any():
+            won = over & self.won
+            lost = over & ~self.won
+            board[won] = np.where(self.mines[won], -2, board[won])
+            board[lost] = np.where(self.mines[lost] & ~self.flags[lost], -1, board[lost])
+            board[over] = np.where(self.flags[over] & ~self.mines[over], -4, board[over])
+        return board
@@ -0,0 +1,160 @@
+# environment/rendering.py
+
+import atexit
+import os
+import queue
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+# Sprite drawn for each sprite code; codes 0-8 are the revealed numbers
+SPRITE_NAMES = [f"cell{n}" for n in range(9)] + ["cellup", "cellflag", "blast", "falsemine", "cellmine"]
+HIDDEN, FLAG, BLAST, FALSE_MINE, MINE = range(9, 14)
+
+
+def sprite_codes(encoded_board: np.ndarray, exploded: np.ndarray) -> np.ndarray:
+    """
+    Map an encoded board (see MinesweeperEnv.get_encoded_board) to sprite codes,
+    indices into SPRITE_NAMES. `exploded` marks revealed mines, which are drawn as
+    blasts rather than plain mines.
+    """
+    codes = np.where(encoded_board >= 0, encoded_board, HIDDEN)
+    codes[encoded_board == -2] = FLAG
+    codes[encoded_board == -4] = FALSE_MINE
+    codes[encoded_board == -1] = MINE
+    codes[(encoded_board == -1) & exploded] = BLAST
+    return codes
+
+
+@lru_cache(maxsize=8)
+def load_sprite_atlas(cell_size: int = 40) -> np.ndarray:
+    """
+    Load the sprites as one read-only (len(SPRITE_NAMES), cell_size, cell_size, 3)
+    uint8 RGB array, indexed by sprite code. Needs no display.
+    """
+    import pygame  # imported on first use, so envs that never render do not load it
+
+    sprites_dir = os.path.join(os.path.dirname(__file__), "sprites")
+    atlas = np.empty((len(SPRITE_NAMES), cell_size, cell_size, 3), dtype=np.uint8)
+    for code, name in enumerate(SPRITE_NAMES):
+        image = pygame.image.load(os.path.join(sprites_dir, name + ".png"))
+        # Same scaling as the human renderer, so both modes draw identical pixels
+        scaled = pygame.transform.scale(image, (cell_size, cell_size))
+        atlas[code] = pygame.surfarray.array3d(scaled).transpose(1, 0, 2)
+    atlas.setflags(write=False)
+    return atlas
+
+
+def compose_frames(codes: np.ndarray, atlas: np.ndarray) -> np.ndarray:
+    """
+    Turn sprite codes of shape (..., height, width) into RGB frames of shape
+    (..., height * cell_size, width * cell_size, 3) with a single gather from the atlas.
+    """
+    cell_size = atlas.shape[1]
+    # Treat each sprite's pixel row as one element, so the gather copies whole rows
+    row_type = np.dtype((np.void, cell_size * 3))
+    sprite_rows = np.ascontiguousarray(atlas).reshape(-1, cell_size * 3).view(row_type).ravel()
+    # Row index code * cell_size + pixel row, laid out as (..., board row, pixel row, board col)
+    row_ids = codes[..., :, None, :] * cell_size + np.arange(cell_size)[:, None]
+    height, width = codes.shape[-2:]
+    return sprite_rows.take(row_ids).view(np.uint8).reshape(
+        *codes.shape[:-2], height * cell_size, width * cell_size, 3)
+
+
+class FrameWriter:
+    """
+    Save rendered frames from a background thread, so recording an episode does
+    not stall the simulation on image encoding and disk writes.
+
+    `target` is either a directory, which receives one PNG per frame, or a path
+    ending in ".npy", into which raw RGB frames are streamed as one (frames, height,
+    width, 3) uint8 array readable with np.load(target, mmap_mode="r"). The .npy
+    stream skips PNG encoding entirely and is much cheaper when frames are many.
+
+    Frames are queued as raw RGB bytes; at most `max_pending` wait at a time, after
+    which write() blocks until the thread catches up. Call close() to flush; writers
+    still open at interpreter exit are closed then. If saving a frame fails, the
+    error is raised from the next write() or close().
+    """
+
+    _HEADER_SIZE = 128  # fixed .npy header size, so the frame count can be patched in on close
+
+    def __init__(self, target: str = "frames", max_pending: int = 256):
+        self.target = target
+        self._stream = None
+        self._frame_shape = None
+        self._num_frames = 0
+        if target.endswith(".npy"):
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            self._stream = open(target, "wb")
+            self._stream.write(b"\0" * self._HEADER_SIZE)
+        else:
+            os.makedirs(target, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="FrameWriter", daemon=True)
+        self._thread.start()
+        # A daemon thread is killed at exit with frames still queued, so flush them then
+        atexit.register(self.close)
+
+    def write(self, surface, filename: str):
+        """
+        Queue a copy of `surface`; `filename` names the PNG and is ignored for .npy streams.
+        """
+        if self._error is not None:
+            raise RuntimeError(f"FrameWriter could not save frames to {self.target}") from self._error
+        width, height = surface.get_size()
+        if self._stream is not None:
+            if self._frame_shape is None:
+                self._frame_shape = (height, width)
+            elif self._frame_shape != (height, width):
+                raise ValueError(f"Frame size {(height, width)} differs from the stream's {self._frame_shape}")
+        import pygame
+
+        data = pygame.image.tobytes(surface, "RGB")
+        self._queue.put((data, (width, height), filename))
+
+    def _run(self):
+        import pygame
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                # Keep draining after a failure, so write() never blocks on a full queue
+                continue
+            data, size, filename = item
+            try:
+                if self._stream is not None:
+                    self._stream.write(data)
+                    self._num_frames += 1
+                else:
+                    pygame.image.save(pygame.image.frombytes(data, size, "RGB"), os.path.join(self.target, filename))
+            except Exception as error:
+                self._error = error
+
+    def close(self):
+        """
+        Wait for queued frames to be written and stop the thread. Raises RuntimeError if
+        any frame could not be saved.
+        """
+        atexit.unregister(self.close)
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._stream is not None and not self._stream.closed:
+            height, width = self._frame_shape or (0, 0)
+            header = "{'descr': '|u1', 'fortran_order': False, 'shape': (%d, %d, %d, 3), }" % (
+                self._num_frames, height, width)
+            # Magic, version 1.0, little-endian header length, then the space-padded dict ending in a newline
+            header_length = self._HEADER_SIZE - 10
+            self._stream.seek(0)
+            self._stream.write(b"\x93NUMPY\x01\x00" + header_length.to_bytes(2, "little")
+                               + header.ljust(header_length - 1).encode("latin1") + b"\n")
+            self._stream.close()
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError(f"FrameWriter could not save frames to {self.target}") from error
@@ -0,0 +1,215 @@
+import multiprocessing as mp
+import traceback
+
+import numpy as np
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+from .minesweeper_env import MinesweeperEnv
+
+
+class SharedMemoryVectorEnv(VectorEnv):
+    """
+    MinesweeperEnv instances stepped in worker processes.
+
+    Each worker owns a contiguous slice of the envs. Actions, observations,
+    rewards and done flags live in shared memory buffers that both sides view
+    as NumPy arrays, so the pipes only carry short commands and nothing is
+    pickled per step. Finished envs are reset on the following step
+    (gymnasium's NEXT_STEP autoreset).
+    """
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(self, num_envs=8, num_workers=None, board_size=(6, 6), num_mines=5, custom_mask=None,
+                 copy=True, context=None):
+        super().__init__()
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers or mp.cpu_count(), num_envs)
+        self.copy = copy
+        env_kwargs = {"board_size": board_size, "num_mines": num_mines, "custom_mask": custom_mask}
+
+        dummy_env = MinesweeperEnv(**env_kwargs)
+        self.single_observation_space = dummy_env.observation_space
+        self.single_action_space = dummy_env.action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        ctx = mp.get_context(context)
+        self._buffer_specs = _buffer_specs(num_envs, board_size, dummy_env.observation_space["visibility_mask"].shape)
+        self._buffers = {name: ctx.RawArray("b", _nbytes(shape, dtype)) for name, (shape, dtype) in self._buffer_specs.items()}
+        self._arrays = _as_arrays(self._buffers, self._buffer_specs)
+
+        self._pipes = []
+        self._processes = []
+        for start, stop in self._worker_bounds():
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(child_pipe, parent_pipe, env_kwargs, start, stop, self._buffers, self._buffer_specs),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        if seed is None or isinstance(seed, int):
+            # Each env gets its own seed so that results do not depend on the worker count
+            seeds = [None] * self.num_envs if seed is None else [seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+
+        for pipe, (start, stop) in zip(self._pipes, self._worker_bounds()):
+            pipe.send(("reset", seeds[start:stop]))
+        self._wait()
+        return self._get_obs(), {}
+
+    def step(self, actions):
+        self._arrays["actions"][:] = actions
+        for pipe in self._pipes:
+            pipe.send(("step", None))
+        self._wait()
+
+        rewards = self._arrays["rewards"]
+        terminated = self._arrays["terminated"]
+        truncated = self._arrays["truncated"]
+        if self.copy:
+            rewards, terminated, truncated = rewards.copy(), terminated.copy(), truncated.copy()
+        return self._get_obs(), rewards, terminated, truncated, {}
+
+    def close_extras(self, **kwargs):
+        for pipe in self._pipes:
+            try:
+                pipe.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for pipe in self._pipes:
+            pipe.close()
+
+    def _worker_bounds(self):
+        bounds = np.linspace(0, self.num_envs, self.num_workers + 1).astype(int)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _wait(self):
+        errors = [message for message in (pipe.recv() for pipe in self._pipes) if message is not None]
+        if errors:
+            raise RuntimeError("Minesweeper worker failed:\n" + errors[0])
+
+    def _get_obs(self):
+        obs = {name: self._arrays[name] for name in ("board", "visibility_mask", "num_mines", "game_over")}
+        return {name: array.copy() for name, array in obs.items()} if self.copy else obs
+
+
+def _buffer_specs(num_envs, board_size, mask_shape):
+    width, height = board_size
+    return {
+        "actions": ((num_envs, 3), np.int64),
+        "board": ((num_envs, height, width), np.int64),
+        "visibility_mask": ((num_envs, *mask_shape), np.int64),
+        "num_mines": ((num_envs,), np.int64),
+        "game_over": ((num_envs,), np.int64),
+        "rewards": ((num_envs,), np.float64),
+        "terminated": ((num_envs,), np.bool_),
+        "truncated": ((num_envs,), np.bool_),
+    }
+
+
+def _nbytes(shape, dtype):
+    return int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+
+def _as_arrays(buffers, specs):
+    return {
+        name: np.frombuffer(buffers[name], dtype=dtype).reshape(shape)
+        for name, (shape, dtype) in specs.items()
+    }
+
+
+def _worker(pipe, parent_pipe, env_kwargs, start, stop, buffers, specs):
+    parent_pipe.close()
+    arrays = {name: array[start:stop] for name, array in _as_arrays(buffers, specs).items()}
+    envs = [MinesweeperEnv(**env_kwargs) for _ in range(start, stop)]
+    autoreset = [False] * len(envs)
+
+    def write_obs(i, obs):
+        arrays["board"][i] = obs["board"]
+        arrays["visibility_mask"][i] = obs["visibility_mask"]
+        arrays["num_mines"][i] = obs["num_mines"]
+        arrays["game_over"][i] = obs["game_over"]
+
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                for i, env in enumerate(envs):
+                    obs, _ = env.reset(seed=data[i])
+                    write_obs(i, obs)
+                    autoreset[i] = False
+                pipe.send(None)
+            elif command == "step":
+                actions = arrays["actions"]
+                for i, env in enumerate(envs):
+                    if autoreset[i]:
+                        obs, _ = env.reset()
+                        reward, terminated, truncated = 0.0, False, False
+                    else:
+                        obs, reward, terminated, truncated, _ = env.step(actions[i])
+                    write_obs(i, obs)
+                    arrays["rewards"][i] = reward
+                    arrays["terminated"][i] = terminated
+                    arrays["truncated"][i] = truncated
+                    autoreset[i] = terminated or truncated
+                pipe.send(None)
+            elif command == "close":
+                break
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        pipe.send(traceback.format_exc())
+    finally:
+        for env in envs:
+            env.close()
+        pipe.close()
+
+
+if __name__ == "__main__":
+    import time
+    from gymnasium.vector import AsyncVectorEnv
+
+    difficulties = [
+        {"board_size": (8, 8), "num_mines": 10, "label": "8x8"},
+        {"board_size": (16, 16), "num_mines": 40, "label": "16x16"},
+        {"board_size": (30, 16), "num_mines": 99, "label": "30x16"},
+    ]
+    num_envs = 64
+    num_steps = 200
+    worker_counts = [1, 2, 4]
+
+    def steps_per_second(envs):
+        envs.reset(seed=0)
+        envs.action_space.seed(0)
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            envs.step(envs.action_space.sample())
+        elapsed = time.perf_counter() - start
+        envs.close()
+        return num_envs * num_steps / elapsed
+
+    # AsyncVectorEnv always runs one process per environment
+    print(f"{num_envs} envs, {num_steps} steps, {mp.cpu_count()} CPU cores; steps/s")
+    print(f"{'':<8}{'AsyncVectorEnv':>16}" + "".join(f"{f'{n} worker(s)':>14}" for n in worker_counts))
+    for setting in difficulties:
+        kwargs = {"board_size": setting["board_size"], "num_mines": setting["num_mines"]}
+        stock = AsyncVectorEnv(
+            [lambda: MinesweeperEnv(**kwargs) for _ in range(num_envs)],
+            shared_memory=True,
+            autoreset_mode=AutoresetMode.NEXT_STEP,
+        )
+        row = f"{setting['label']:<8}{steps_per_second(stock):>16.0f}"
+        for num_workers in worker_counts:
+            shared = SharedMemoryVectorEnv(num_envs=num_envs, num_workers=num_workers, **kwargs)
+            row += f"{steps_per_second(shared):>14.0f}"
+        print(row)
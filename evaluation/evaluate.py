@@ -1,14 +1,105 @@
 # evaluation/evaluate.py
 
 import os
-import json
 import csv
+import random
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from typing import Type, Dict, List
 from backend.game import GameSession
+from evaluation.replay import record_episode
+from evaluation.replay_io import ReplayWriter
 from models.base_agent import BaseAgent
 
 
+_worker_agent = None
+
+
+def _episode_seed(seed: int, episode: int):
+    return None if seed is None else seed + episode
+
+
+def _play_episode(agent: BaseAgent, width: int, height: int, num_mines: int, episode: int,
+                  seed: int = None, record_replay: bool = False, no_guess: bool = False):
+    """
+    Play one episode and return its summary row and, if requested, its replay record.
+    A seed fixes both the board layout and the agent's `random` draws; the caller's
+    `random` state is restored afterwards. With no_guess the board is solvable by
+    deduction and its safe start cell is revealed for the agent.
+    """
+    if seed is None:
+        return _run_episode(agent, width, height, num_mines, episode, seed, record_replay, no_guess)
+    saved_state = random.getstate()
+    random.seed(seed)
+    try:
+        return _run_episode(agent, width, height, num_mines, episode, seed, record_replay, no_guess)
+    finally:
+        random.setstate(saved_state)
+
+
+def _run_episode(agent, width, height, num_mines, episode, seed, record_replay, no_guess):
+    game = GameSession(width, height, num_mines, seed=seed, no_guess=no_guess)
+    moves = 0
+    actions = []
+
+    if no_guess:
+        actions.append(("reveal", *game.safe_start))
+        game.step(*actions[-1])
+
+    while not game.is_game_over():
+        state = game.get_state()
+        action = agent.act(state)
+        if record_replay:
+            actions.append(action)
+        game.step(*action)
+        moves += 1
+
+    won = game.is_win()
+    row = {
+        "episode": episode,
+        "moves": moves,
+        "won": won,
+        "score": game.get_score()
+    }
+    replay_entry = record_episode(game, actions, episode=episode, won=won) if record_replay else None
+    return row, replay_entry
+
+
+def _init_worker(agent_class: Type[BaseAgent], agent_config: Dict):
+    global _worker_agent
+    # Forked workers inherit the parent's `random` state; give each its own so unseeded
+    # episodes do not replay the same agent draws in every worker
+    random.seed()
+    _worker_agent = agent_class(config=agent_config)
+
+
+def _play_episodes(episodes: List[int], width: int, height: int, num_mines: int, seed: int, record_replay: bool,
+                   no_guess: bool):
+    return [
+        _play_episode(_worker_agent, width, height, num_mines, ep, _episode_seed(seed, ep), record_replay, no_guess)
+        for ep in episodes
+    ]
+
+
+def _iter_pool_results(pool: ProcessPoolExecutor, episodes: List[int], width: int, height: int, num_mines: int,
+                       seed: int, record_replay: bool, no_guess: bool, chunk_size: int, max_pending: int):
+    """
+    Yield episode results from the pool in episode order, dropping each chunk once consumed.
+    Only max_pending chunks are submitted at a time, so finished results that have
+    not been consumed yet (replays included) do not pile up in memory.
+    """
+    chunks = (episodes[i:i + chunk_size] for i in range(0, len(episodes), chunk_size))
+    futures = deque()
+    for chunk in chunks:
+        futures.append(pool.submit(_play_episodes, chunk, width, height, num_mines, seed, record_replay, no_guess))
+        if len(futures) >= max_pending:
+            yield from futures.popleft().result()
+    while futures:
+        yield from futures.popleft().result()
+
+
 def evaluate_agent(
     agent_class: Type[BaseAgent],
     num_episodes: int,
@@ -17,74 +108,77 @@ def evaluate_agent(
     num_mines: int,
     agent_config: Dict = None,
     verbose: bool = False,
-    save_dir: str = None
+    save_dir: str = None,
+    num_workers: int = 1,
+    seed: int = None,
+    no_guess: bool = False
 ):
     """
     Evaluate the agent and optionally log results and save replays.
+    Returns the per-episode summary rows.
+
+    Replays are streamed to replays_<timestamp>.jsonl.gz in save_dir, one episode
+    per line; read them back lazily with evaluation.replay_io.iter_replays. Each
+    stores the mine layout and actions; evaluation.replay.ReplayEngine rebuilds
+    the state of any step.
+
+    With num_workers > 1 the episodes are sharded across a process pool with one
+    agent instance per worker. Episode i is played with seed + i, so a seeded
+    evaluation gives the same results for any number of workers.
+
+    With no_guess the boards are generated to be solvable without guessing from a
+    revealed safe start cell, so results are not decided by forced guesses.
     """
     os.makedirs(save_dir, exist_ok=True) if save_dir else None
+    record_replay = save_dir is not None
+    episodes = list(range(1, num_episodes + 1))
 
-    agent = agent_class(config=agent_config)
     summary = []
-    replays = []
-
     wins = 0
     total_moves = 0
 
-    for ep in range(1, num_episodes + 1):
-        game = GameSession(width, height, num_mines)
-        moves = 0
-        replay = []
-
-        while not game.is_game_over():
-            state = game.get_state()
-            action = agent.act(state)
-            replay.append({
-                "step": moves,
-                "state": state,
-                "action": action
-            })
-            game.step(*action)
-            moves += 1
-
-        won = game.is_win()
-        score = game.get_score()
-        summary.append({
-            "episode": ep,
-            "moves": moves,
-            "won": won,
-            "score": score
-        })
+    # Write logs and replays as episodes finish, so only the summary rows are kept in memory
+    with ExitStack() as stack:
         if save_dir:
-            replays.append({
-                "episode": ep,
-                "won": won,
-                "replay": replay
-            })
-
-        total_moves += moves
-        wins += int(won)
-
-        if verbose:
-            print(f"Episode {ep}: {'WIN' if won else 'loss'} in {moves} moves (score: {score:.2f})")
+            timestamp = int(time.time())
+            summary_file = stack.enter_context(open(f"{save_dir}/summary_{timestamp}.csv", "w", newline=""))
+            summary_writer = csv.DictWriter(summary_file, fieldnames=["episode", "moves", "won", "score"])
+            summary_writer.writeheader()
+            replay_writer = stack.enter_context(ReplayWriter(f"{save_dir}/replays_{timestamp}.jsonl.gz"))
+
+        if num_workers <= 1:
+            agent = agent_class(config=agent_config)
+            results = (
+                _play_episode(agent, width, height, num_mines, ep, _episode_seed(seed, ep), record_replay, no_guess)
+                for ep in episodes
+            )
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                                                           initargs=(agent_class, agent_config)))
+            results = _iter_pool_results(pool, episodes, width, height, num_mines, seed, record_replay, no_guess,
+                                         chunk_size=max(1, -(-num_episodes // (num_workers * 4))),
+                                         max_pending=2 * num_workers)
+
+        for row, replay in results:
+            summary.append(row)
+            total_moves += row["moves"]
+            wins += int(row["won"])
+            if save_dir:
+                summary_writer.writerow(row)
+                replay_writer.write(replay)
+
+            if verbose:
+                print(f"Episode {row['episode']}: {'WIN' if row['won'] else 'loss'} in {row['moves']} moves (score: {row['score']:.2f})")
 
     win_rate = wins / num_episodes
     avg_moves = total_moves / num_episodes
     print(f"\n{agent_class.__name__} - Win rate: {win_rate:.2%}, Avg moves: {avg_moves:.1f}")
 
-    # Save logs
-    if save_dir:
-        timestamp = int(time.time())
-        with open(f"{save_dir}/summary_{timestamp}.csv", "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=["episode", "moves", "won", "score"])
-            writer.writeheader()
-            writer.writerows(summary)
-
-        with open(f"{save_dir}/replays_{timestamp}.json", "w") as f:
-            json.dump(replays, f, indent=2)
+    return summary
 
 
-def evaluate_multiple_difficulties(agent_class: Type[BaseAgent], agent_config: Dict = None):
+def evaluate_multiple_difficulties(agent_class: Type[BaseAgent], agent_config: Dict = None, num_workers: int = 1,
+                                   seed: int = None, no_guess: bool = False):
     difficulties = [
         {"width": 8, "height": 8, "num_mines": 10, "label": "easy"},
         {"width": 16, "height": 16, "num_mines": 40, "label": "medium"},
@@ -100,7 +194,10 @@ def evaluate_multiple_difficulties(agent_class: Type[BaseAgent], agent_config: D
             num_mines=setting["num_mines"],
             agent_config=agent_config,
             save_dir=f"evaluation/logs/{agent_class.__name__.lower()}_{setting['label']}",
-            verbose=False
+            verbose=False,
+            num_workers=num_workers,
+            seed=seed,
+            no_guess=no_guess
         )
 
 
@@ -2,6 +2,7 @@
 
 import os
 import csv
+import sqlite3
 from collections import defaultdict
 from glob import glob
 
@@ -19,15 +20,25 @@ def load_summary_csv(path: str):
     return data
 
 
+def find_summary_csvs(log_dir: str):
+    return glob(os.path.join(log_dir, "**", "summary_*.csv"), recursive=True)
+
+
+def agent_and_difficulty(csv_file: str):
+    """
+    Split the <agent>_<difficulty> directory a summary CSV lives in.
+    """
+    agent_name = os.path.basename(os.path.dirname(csv_file))
+    difficulty = agent_name.split("_")[-1]
+    agent_base = "_".join(agent_name.split("_")[:-1])
+    return agent_base, difficulty
+
+
 def summarize_agent_logs(log_dir: str):
     leaderboard = defaultdict(lambda: {"wins": 0, "games": 0, "total_moves": 0, "total_score": 0.0})
 
-    for csv_file in glob(os.path.join(log_dir, "**", "summary_*.csv"), recursive=True):
-        agent_name = csv_file.split("/")[-2]
-        difficulty = agent_name.split("_")[-1]
-        agent_base = "_".join(agent_name.split("_")[:-1])
-
-        key = (agent_base, difficulty)
+    for csv_file in find_summary_csvs(log_dir):
+        key = agent_and_difficulty(csv_file)
         data = load_summary_csv(csv_file)
         for row in data:
             leaderboard[key]["games"] += 1
@@ -39,6 +50,115 @@ def summarize_agent_logs(log_dir: str):
     return leaderboard
 
 
+class LeaderboardStore:
+    """
+    SQLite index of evaluation summaries.
+
+    ingest() only parses summary CSVs that are new or whose mtime/size changed
+    since the last run, and keeps running per-(agent, difficulty) totals, so
+    building the leaderboard does not re-read the logs.
+    """
+
+    def __init__(self, db_path: str = "evaluation/logs/leaderboard.sqlite"):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                agent TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                games INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                total_moves INTEGER NOT NULL,
+                total_score REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS aggregates (
+                agent TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                games INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                total_moves INTEGER NOT NULL,
+                total_score REAL NOT NULL,
+                PRIMARY KEY (agent, difficulty)
+            );
+        """)
+
+    def ingest(self, log_dir: str) -> int:
+        """
+        Index new, changed and deleted summary CSVs under log_dir. Returns the number of files parsed.
+        """
+        known = {
+            path: (mtime, size)
+            for path, mtime, size in self.conn.execute("SELECT path, mtime, size FROM files")
+        }
+        parsed = 0
+        seen = set()
+        with self.conn:
+            for csv_file in find_summary_csvs(log_dir):
+                path = os.path.abspath(csv_file)
+                seen.add(path)
+                stat = os.stat(path)
+                if known.get(path) == (stat.st_mtime, stat.st_size):
+                    continue
+
+                self._remove_file(path)
+                agent, difficulty = agent_and_difficulty(path)
+                data = load_summary_csv(path)
+                totals = (
+                    len(data),
+                    sum(1 for row in data if row["won"]),
+                    sum(row["moves"] for row in data),
+                    sum(row["score"] for row in data),
+                )
+                self.conn.execute(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, stat.st_mtime, stat.st_size, agent, difficulty, *totals),
+                )
+                self._add_totals(agent, difficulty, totals)
+                parsed += 1
+
+            root = os.path.abspath(log_dir) + os.sep
+            for path in known:
+                if path.startswith(root) and path not in seen:
+                    self._remove_file(path)
+        return parsed
+
+    def leaderboard(self):
+        """
+        Return the aggregates in the same shape as summarize_agent_logs().
+        """
+        return {
+            (agent, difficulty): {"wins": wins, "games": games, "total_moves": total_moves, "total_score": total_score}
+            for agent, difficulty, games, wins, total_moves, total_score in self.conn.execute(
+                "SELECT agent, difficulty, games, wins, total_moves, total_score FROM aggregates WHERE games > 0"
+            )
+        }
+
+    def close(self):
+        self.conn.close()
+
+    def _add_totals(self, agent, difficulty, totals, sign=1):
+        games, wins, total_moves, total_score = (sign * value for value in totals)
+        self.conn.execute("""
+            INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (agent, difficulty) DO UPDATE SET
+                games = games + excluded.games,
+                wins = wins + excluded.wins,
+                total_moves = total_moves + excluded.total_moves,
+                total_score = total_score + excluded.total_score
+        """, (agent, difficulty, games, wins, total_moves, total_score))
+
+    def _remove_file(self, path):
+        row = self.conn.execute(
+            "SELECT agent, difficulty, games, wins, total_moves, total_score FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None:
+            self._add_totals(row[0], row[1], row[2:], sign=-1)
+            self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+
 def display_leaderboard(leaderboard):
     print("\n🏆 Minesweeper AI Leaderboard\n")
     header = f"{'Agent':<20} {'Difficulty':<10} {'Win Rate':<10} {'Avg Moves':<12} {'Avg Score'}"
@@ -78,7 +198,10 @@ def export_leaderboard_markdown(leaderboard, path="leaderboard.md"):
 
 
 if __name__ == "__main__":
-    leaderboard = summarize_agent_logs("evaluation/logs")
+    store = LeaderboardStore()
+    store.ingest("evaluation/logs")
+    leaderboard = store.leaderboard()
+    store.close()
     display_leaderboard(leaderboard)
     export_leaderboard_csv(leaderboard)
     export_leaderboard_markdown(leaderboard)
@@ -0,0 +1,83 @@
+# evaluation/replay.py
+
+import copy
+from typing import Dict, Iterator, List, Sequence
+from backend.game import GameSession
+
+
+def record_episode(game: GameSession, actions: List[Sequence], **fields) -> Dict:
+    """
+    Build a compact replay record: board parameters, mine layout and action list.
+    Extra fields (e.g. episode, won) are stored alongside.
+    """
+    return {
+        **fields,
+        "width": game.width,
+        "height": game.height,
+        "num_mines": game.num_mines,
+        "custom_mask": [list(offset) for offset in game.custom_mask],
+        "seed": game.seed,
+        "mines": game.board.get_mine_layout(),
+        "actions": [list(action) for action in actions],
+    }
+
+
+class ReplayEngine:
+    """
+    Rebuilds the GameSession of any step of a recorded episode by replaying its actions.
+
+    A deep copy of the session is kept every keyframe_interval steps, so seeking to
+    a step replays at most keyframe_interval actions from the nearest keyframe.
+    """
+
+    def __init__(self, width: int, height: int, num_mines: int, mines: List[int], actions: List[Sequence],
+                 custom_mask: list[tuple[int, int]] | None = None, keyframe_interval: int = 50):
+        self.actions = [tuple(action) for action in actions]
+        self.keyframe_interval = keyframe_interval
+
+        game = GameSession(width, height, num_mines, custom_mask=custom_mask, mine_layout=mines)
+        self._keyframes = [copy.deepcopy(game)]
+        for step, action in enumerate(self.actions, start=1):
+            game.apply_action(*action)
+            if step % keyframe_interval == 0:
+                self._keyframes.append(copy.deepcopy(game))
+
+    @classmethod
+    def from_record(cls, record: Dict, keyframe_interval: int = 50) -> "ReplayEngine":
+        custom_mask = record.get("custom_mask")
+        return cls(
+            record["width"], record["height"], record["num_mines"], record["mines"], record["actions"],
+            custom_mask=[tuple(offset) for offset in custom_mask] if custom_mask is not None else None,
+            keyframe_interval=keyframe_interval,
+        )
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def session_at(self, step: int) -> GameSession:
+        """
+        Return a fresh GameSession as it was after the first `step` actions.
+        """
+        if not 0 <= step <= len(self.actions):
+            raise IndexError(f"step {step} out of range for a replay of {len(self.actions)} actions")
+        keyframe = step // self.keyframe_interval
+        game = copy.deepcopy(self._keyframes[keyframe])
+        for action in self.actions[keyframe * self.keyframe_interval:step]:
+            game.apply_action(*action)
+        return game
+
+    def state_at(self, step: int) -> Dict:
+        """
+        Return get_state() before action `step` is played (after it, for step == len(self)).
+        """
+        return self.session_at(step).get_state()
+
+    def iter_states(self) -> Iterator[Dict]:
+        """
+        Yield the state before every action and then the final state, replaying once.
+        """
+        game = copy.deepcopy(self._keyframes[0])
+        yield game.get_state()
+        for action in self.actions:
+            game.apply_action(*action)
+            yield game.get_state()
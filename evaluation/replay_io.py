@@ -0,0 +1,39 @@
+# evaluation/replay_io.py
+
+import gzip
+import json
+from typing import Dict, Iterator
+
+
+class ReplayWriter:
+    """
+    Stream episode replays to a gzip-compressed JSON Lines file, one episode per line.
+    Only the episode being written is held in memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def write(self, episode: Dict):
+        self._file.write(json.dumps(episode, separators=(",", ":")))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_replays(path: str) -> Iterator[Dict]:
+    """
+    Lazily yield the episodes stored in a replay file written by ReplayWriter.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
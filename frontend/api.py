@@ -1,16 +1,37 @@
 # frontend/api.py
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from backend.game import GameSession
+from backend.neighbors import DEFAULT_NEIGHBORS
+from frontend.sessions import SessionStore
 
 api_blueprint = Blueprint("api", __name__)
 
-game = None
+# Games are kept per session ID; clients get theirs from /new_game or /play_agent
+session_store = SessionStore()
+
+
+def configure_sessions(max_sessions: int = 1000, ttl: float = 3600, spill_dir: str = None):
+    """
+    Replace the session store, e.g. with limits from the command line.
+    """
+    global session_store
+    session_store = SessionStore(max_sessions=max_sessions, ttl=ttl, spill_dir=spill_dir)
+
+
+def _session_id(data=None):
+    """
+    Read the session ID from the JSON body, the query string or the X-Session-ID header.
+    """
+    return (data or {}).get("session_id") or request.args.get("session_id") or request.headers.get("X-Session-ID")
+
+
+def _with_session_id(state: dict, session_id: str) -> dict:
+    return {**state, "session_id": session_id}
 
 
 @api_blueprint.route("/new_game", methods=["POST"])
 def new_game():
-    global game
     data = request.json
     width = data.get("width", 8)
     height = data.get("height", 8)
@@ -18,9 +39,9 @@ def new_game():
     custom_mask = data.get("custom_mask", None)
     # print(f"New game request with mask: {custom_mask}") # Debugging
 
-    # Global session (for now – can be improved later with user/session IDs)
     game = GameSession(width=width, height=height, num_mines=num_mines, custom_mask=custom_mask)
-    return jsonify(game.get_state())
+    session_id = session_store.create(game)
+    return jsonify(_with_session_id(game.get_state(), session_id))
 
 
 @api_blueprint.route("/step", methods=["POST"])
@@ -29,68 +50,160 @@ def step():
     action = data.get("action")
     row = data.get("row")
     col = data.get("col")
+    session_id = _session_id(data)
 
-    if action not in {"reveal", "flag"} or row is None or col is None:
+    if action not in {"reveal", "flag"} or row is None or col is None or session_id is None:
         return jsonify({"error": "Invalid input"}), 400
 
-    result = game.step(action, row, col)
-    return jsonify(result)
+    try:
+        with session_store.acquire(session_id) as game:
+            if data.get("delta"):
+                # Only changed cells; the client passes the version it last saw to detect drift
+                result = game.step_delta(action, row, col, known_version=data.get("version"))
+            else:
+                result = game.step(action, row, col)
+    except KeyError:
+        return jsonify({"error": "Unknown session"}), 404
+    return jsonify(_with_session_id(result, session_id))
+
+
+@api_blueprint.route("/batch_step", methods=["POST"])
+def batch_step():
+    """
+    Apply a list of actions in order in one request. Each action may name its own
+    session_id (defaulting to the request's). Results are delta-encoded like
+    /step with "delta": true; once a session's game is over, its remaining
+    actions are skipped.
+    """
+    data = request.json
+    actions = data.get("actions")
+    default_session_id = _session_id(data)
+
+    if not isinstance(actions, list):
+        return jsonify({"error": "Invalid input"}), 400
+    for item in actions:
+        if not isinstance(item, dict) or item.get("action") not in {"reveal", "flag"} or \
+           item.get("row") is None or item.get("col") is None or \
+           (item.get("session_id") or default_session_id) is None:
+            return jsonify({"error": "Invalid input"}), 400
+
+    results = []
+    for index, item in enumerate(actions):
+        session_id = item.get("session_id") or default_session_id
+        result = {"index": index, "session_id": session_id}
+        try:
+            with session_store.acquire(session_id) as game:
+                if game.is_game_over():
+                    result["skipped"] = True
+                else:
+                    result.update(game.step_delta(item["action"], item["row"], item["col"]))
+        except KeyError:
+            result["error"] = "Unknown session"
+        results.append(result)
+
+    return jsonify({"results": results})
 
 
 @api_blueprint.route("/state", methods=["GET"])
 def get_state():
-    return jsonify(game.get_state())
+    session_id = _session_id()
+    if session_id is None:
+        return jsonify({"error": "Invalid input"}), 400
+
+    try:
+        with session_store.acquire(session_id) as game:
+            state = game.get_state()
+    except KeyError:
+        return jsonify({"error": "Unknown session"}), 404
+    return jsonify(_with_session_id(state, session_id))
 
-from models.random_agent.agent import RandomAgent
-# Future: from models.your_agent.agent import YourAgent
+# Agents are discovered under models/ and imported on first use (see models/registry.py)
+from models.registry import AGENT_REGISTRY
 
-AGENT_REGISTRY = {
-    "random": RandomAgent,
-    # "your_agent_name": YourAgent,
-}
 @api_blueprint.route("/play_agent", methods=["POST"])
 def play_agent():
-    global game
     data = request.json
     agent_type = data.get("agent", "random").lower()
-    agent_cls = AGENT_REGISTRY.get(agent_type, RandomAgent)
+    agent_cls = AGENT_REGISTRY.get(agent_type) or AGENT_REGISTRY["random"]
 
     width = data.get("width")
     height = data.get("height")
     num_mines = data.get("num_mines")
     custom_mask = data.get("custom_mask", None)
+    session_id = _session_id(data)
 
     # print(f"Agent play request with mask: {custom_mask}") # Debugging
 
-    if game is None or \
-       (width is not None and game.width != width) or \
-       (height is not None and game.height != height) or \
-       (num_mines is not None and game.num_mines != num_mines) or \
-       (custom_mask != game.custom_mask):
-        current_width = width if width is not None else (game.width if game else 8)
-        current_height = height if height is not None else (game.height if game else 8)
-        current_num_mines = num_mines if num_mines is not None else (game.num_mines if game else 10)
-        game = GameSession(width=current_width, height=current_height, num_mines=current_num_mines, custom_mask=custom_mask)
-    else:
-        game.reset()  # Reset with existing dimensions and mask if no new ones are provided
-
-    agent = agent_cls()
-    frames = []
+    if session_id is None or session_id not in session_store:
+        session_id = session_store.create(GameSession(
+            width=width if width is not None else 8,
+            height=height if height is not None else 8,
+            num_mines=num_mines if num_mines is not None else 10,
+            custom_mask=custom_mask
+        ))
+
+    def prepare_game(game):
+        # Masks arrive as JSON lists of lists; no mask means the default neighbourhood
+        if (width is not None and game.width != width) or \
+           (height is not None and game.height != height) or \
+           (num_mines is not None and game.num_mines != num_mines) or \
+           (_mask_offsets(custom_mask) != _mask_offsets(game.custom_mask)):
+            game = GameSession(width=width if width is not None else game.width,
+                               height=height if height is not None else game.height,
+                               num_mines=num_mines if num_mines is not None else game.num_mines,
+                               custom_mask=custom_mask)
+            # Called with the session's lock held, so the new game stays behind it
+            session_store.replace(session_id, game)
+        else:
+            game.reset()  # Reset with existing dimensions and mask if no new ones are provided
+        return game
+
+    if data.get("stream"):
+        # One JSON object per line: a frame per move as it is played, then the final state
+        def generate():
+            try:
+                with session_store.acquire(session_id) as game:
+                    game = prepare_game(game)
+                    for frame in _agent_frames(game, agent_cls()):
+                        yield current_app.json.dumps(frame) + "\n"
+                    yield current_app.json.dumps({"final": game.get_state(), "session_id": session_id}) + "\n"
+            except KeyError:
+                yield current_app.json.dumps({"error": "Unknown session"}) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    try:
+        with session_store.acquire(session_id) as game:
+            game = prepare_game(game)
+            frames = list(_agent_frames(game, agent_cls()))
+            final = game.get_state()
+    except KeyError:
+        return jsonify({"error": "Unknown session"}), 404
 
+    return jsonify({
+        "frames": frames,
+        "final": final,
+        "session_id": session_id
+    })
+
+
+def _mask_offsets(custom_mask) -> list:
+    return [tuple(offset) for offset in (custom_mask if custom_mask is not None else DEFAULT_NEIGHBORS)]
+
+
+def _agent_frames(game: GameSession, agent):
+    """
+    Let the agent play the game to the end, yielding a frame after each move.
+    """
+    state = game.get_state()
     while not game.is_game_over():
-        state = game.get_state()
         action = agent.act(state)
-        game.step(*action)
-        frames.append({
-            "state": game.get_state(),
+        state = game.step(*action)
+        yield {
+            "state": state,
             "action": {
                 "type": action[0],
                 "row": action[1],
                 "col": action[2]
             }
-        })
-
-    return jsonify({
-        "frames": frames,
-        "final": game.get_state()
-    })
+        }
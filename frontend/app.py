@@ -1,17 +1,53 @@
 # frontend/app.py
 
-from flask import Flask, render_template
-from frontend.api import api_blueprint
+import time
+
+from flask import Flask, Response, g, render_template, request
+from backend import metrics
+from frontend.api import api_blueprint, configure_sessions
 
 app = Flask(__name__, static_folder="static", template_folder="templates")
 app.register_blueprint(api_blueprint, url_prefix="/api")
 
 
+@app.before_request
+def _start_timer():
+    if metrics.enabled:
+        g.metrics_start = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    start = g.pop("metrics_start", None)
+    if start is not None:
+        # Label by route pattern, not raw path, so session ids do not create new series
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        method, status = request.method, response.status_code
+
+        def record():
+            metrics.record_request(route, method, status, time.perf_counter() - start)
+
+        # A streamed body (/api/play_agent) is still being produced; time it until it is sent
+        if response.is_streamed:
+            response.call_on_close(record)
+        else:
+            record()
+    return response
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
 
 
+@app.route("/metrics")
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint; values stay empty unless metrics are enabled.
+    """
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
 def main():
     import argparse
 
@@ -19,10 +55,42 @@ def main():
     parser.add_argument("--port", type=int, default=5000, help="Port to run the server on")
     parser.add_argument("--host", type=str, default="0.0.0.0", help="Host IP")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="Game sessions kept in memory")
+    parser.add_argument("--session-ttl", type=float, default=3600, help="Seconds before an idle session is evicted")
+    parser.add_argument("--spill-dir", type=str, default=None, help="Directory to spill evicted sessions to")
+    parser.add_argument("--server", choices=["flask", "uvicorn"], default="flask",
+                        help="flask: development server; uvicorn: async ASGI server (needs the asgi extra)")
+    parser.add_argument("--threads", type=int, default=32,
+                        help="uvicorn: threads handling requests (one process, since sessions live in memory)")
+    parser.add_argument("--limit-concurrency", type=int, default=None,
+                        help="uvicorn: maximum concurrent connections before returning 503")
+    parser.add_argument("--backlog", type=int, default=2048, help="uvicorn: maximum pending connections")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Record counters and latencies, served at /metrics (also MINESWEEPER_METRICS=1)")
     args = parser.parse_args()
 
+    if args.metrics:
+        metrics.enable()
+
+    configure_sessions(max_sessions=args.max_sessions, ttl=args.session_ttl, spill_dir=args.spill_dir)
+
     print(f"Running on http://{args.host}:{args.port}/")
-    app.run(debug=args.debug, host=args.host, port=args.port)
+    if args.server == "uvicorn":
+        try:
+            import uvicorn
+            from frontend.asgi import create_asgi_app
+        except ImportError:
+            parser.error("--server uvicorn needs the asgi extra: pip install minesweeper_rl[asgi]")
+        uvicorn.run(
+            create_asgi_app(threads=args.threads),
+            host=args.host,
+            port=args.port,
+            limit_concurrency=args.limit_concurrency,
+            backlog=args.backlog,
+            log_level="debug" if args.debug else "warning",
+        )
+    else:
+        app.run(debug=args.debug, host=args.host, port=args.port)
 
 
 if __name__ == "__main__":
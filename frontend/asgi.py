@@ -0,0 +1,31 @@
+# frontend/asgi.py
+#
+# ASGI entry point for serving the game under an async server, e.g.
+#   uvicorn frontend.asgi:asgi_app
+# Needs the "asgi" extra (uvicorn, a2wsgi).
+
+from functools import lru_cache
+
+from a2wsgi import WSGIMiddleware
+from frontend.app import app
+
+
+def create_asgi_app(threads: int = 32):
+    """
+    Wrap the Flask app as an ASGI app. Requests are handled on a pool of `threads` threads,
+    so slow requests do not block the event loop or each other.
+    """
+    return WSGIMiddleware(app, workers=threads)
+
+
+@lru_cache(maxsize=None)
+def _default_asgi_app():
+    return create_asgi_app()
+
+
+def __getattr__(name):
+    # asgi_app is built on first access, so importing this module (as main() does)
+    # does not set up a thread pool that is never used
+    if name == "asgi_app":
+        return _default_asgi_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
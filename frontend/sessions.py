@@ -0,0 +1,190 @@
+# frontend/sessions.py
+
+import os
+import pickle
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from backend.game import GameSession
+
+_SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class _Session:
+    def __init__(self, game: GameSession):
+        self.game = game
+        self.lock = threading.Lock()
+        self.last_access = time.monotonic()
+        self.evicted = False
+
+
+class SessionStore:
+    """
+    GameSessions keyed by session ID, each with its own lock.
+
+    At most max_sessions are kept in memory: the least recently used session is
+    evicted when a new one is added, and sessions idle for longer than ttl
+    seconds are evicted on the next access. With a spill_dir, evicted sessions
+    are pickled to disk and reloaded transparently when they are used again;
+    without one they are dropped.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600, spill_dir: str = None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self._sessions = OrderedDict()
+        self._spilling = {}  # session_id -> session being written to disk by _spill
+        self._lock = threading.Lock()
+
+    def create(self, game: GameSession, session_id: str = None) -> str:
+        """
+        Store a game under session_id (a new random ID if not given) and return the ID.
+        """
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            old = self._sessions.pop(session_id, None)
+            if old is not None:
+                old.evicted = True
+            self._sessions[session_id] = _Session(game)
+            evicted = self._evict(keep=session_id)
+        self._spill(evicted)
+        return session_id
+
+    @contextmanager
+    def acquire(self, session_id: str):
+        """
+        Hold the session's lock and yield its GameSession. Raises KeyError for unknown IDs.
+        """
+        while True:
+            session = self._lookup(session_id)
+            with session.lock:
+                if session.evicted:
+                    # Evicted between lookup and lock; look it up again
+                    continue
+                yield session.game
+                session.last_access = time.monotonic()
+                return
+
+    def replace(self, session_id: str, game: GameSession):
+        """
+        Swap in a new game for a session whose lock the caller holds through acquire(),
+        so other requests keep waiting on the same lock.
+        """
+        with self._lock:
+            self._sessions[session_id].game = game
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return (session_id in self._sessions or session_id in self._spilling
+                    or os.path.exists(self._spill_path(session_id)))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _lookup(self, session_id):
+        while True:
+            loading = None
+            with self._lock:
+                session = self._sessions.get(session_id)
+                spilling = self._spilling.get(session_id) if session is None else None
+                if session is None and spilling is None:
+                    if not self._spill_path(session_id):
+                        raise KeyError(session_id)
+                    # Locked until _load_spilled fills it in, so other requests for it wait on its lock
+                    session = loading = _Session(None)
+                    session.lock.acquire()
+                    self._sessions[session_id] = session
+                if session is not None:
+                    self._sessions.move_to_end(session_id)
+                    session.last_access = time.monotonic()
+                    # A session still being loaded may not exist on disk, so evict only once it is in
+                    evicted = self._evict(keep=session_id) if loading is None else []
+            if session is None:
+                # Being written to disk; its lock is held until the file is in place
+                with spilling.lock:
+                    pass
+                continue
+            if loading is not None:
+                self._load_spilled(session_id, loading)
+                with self._lock:
+                    evicted = self._evict(keep=session_id)
+            self._spill(evicted)
+            return session
+
+    def _evict(self, keep: str):
+        """
+        Remove expired sessions and then least recently used ones beyond max_sessions,
+        scanning from the least recently used end and stopping at the first session
+        that is neither. Sessions whose lock is held by a request are skipped, as is
+        `keep`, the session being looked up or created.
+        Called with self._lock held; returns the removed (session_id, session) pairs,
+        still locked, to be passed to _spill once self._lock is released.
+        """
+        now = time.monotonic()
+        evicted = []
+        for session_id, session in self._sessions.items():
+            overflow = len(self._sessions) - len(evicted) > self.max_sessions
+            if not overflow and now - session.last_access < self.ttl:
+                break
+            if session_id != keep and session.lock.acquire(blocking=False):
+                evicted.append((session_id, session))
+        for session_id, session in evicted:
+            session.evicted = True
+            del self._sessions[session_id]
+            if self._spill_path(session_id):
+                self._spilling[session_id] = session
+        return evicted
+
+    def _spill_path(self, session_id):
+        # Client-supplied IDs only reach the filesystem if they are plain tokens
+        if not self.spill_dir or not _SESSION_ID_PATTERN.fullmatch(session_id):
+            return ""
+        return os.path.join(self.spill_dir, f"{session_id}.pkl")
+
+    def _spill(self, evicted):
+        """
+        Pickle sessions removed by _evict to disk (if there is a spill_dir) and release
+        their locks. Called without self._lock, so other requests are not held up by disk writes.
+        """
+        try:
+            for session_id, session in evicted:
+                path = self._spill_path(session_id)
+                if path:
+                    with open(path + ".tmp", "wb") as f:
+                        pickle.dump(session.game, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(path + ".tmp", path)
+        finally:
+            with self._lock:
+                for session_id, _ in evicted:
+                    self._spilling.pop(session_id, None)
+            for _, session in evicted:
+                session.lock.release()
+
+    def _load_spilled(self, session_id, session):
+        """
+        Read a spilled game into `session`, the locked placeholder _lookup stored for it,
+        and release its lock. Called without self._lock. Raises KeyError if nothing was spilled.
+        """
+        path = self._spill_path(session_id)
+        try:
+            with open(path, "rb") as f:
+                session.game = pickle.load(f)
+            os.remove(path)
+        except BaseException as error:
+            with self._lock:
+                if self._sessions.get(session_id) is session:
+                    del self._sessions[session_id]
+            session.evicted = True
+            if isinstance(error, FileNotFoundError):
+                raise KeyError(session_id) from None
+            raise
+        finally:
+            session.lock.release()
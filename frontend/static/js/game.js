@@ -1,6 +1,7 @@
 let currentState = null;
 let showHints = false; // Initialize showHints
 let currentCustomMask = null; // Variable to store the current custom mask
+let sessionId = null; // Server-side game session, returned by /api/new_game and /api/play_agent
 
 document.addEventListener("DOMContentLoaded", () => {
     document.getElementById("new-game-btn").addEventListener("click", startNewGame);
@@ -39,6 +40,7 @@ function startNewGame() {
     })
     .then(response => response.json())
     .then(data => {
+        sessionId = data.session_id;
         currentState = data;
         renderBoard();
         updateStatus();
@@ -109,11 +111,11 @@ function handleReveal(event) {
     fetch("/api/step", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ action: "reveal", row: parseInt(row), col: parseInt(col) })
+        body: JSON.stringify({ action: "reveal", row: parseInt(row), col: parseInt(col), session_id: sessionId, delta: true, version: currentState.version })
     })
     .then(res => res.json())
     .then(data => {
-        currentState = data;
+        applyStepResponse(data);
         renderBoard();
         updateStatus();
     });
@@ -127,16 +129,28 @@ function handleFlag(event) {
     fetch("/api/step", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ action: "flag", row: parseInt(row), col: parseInt(col) })
+        body: JSON.stringify({ action: "flag", row: parseInt(row), col: parseInt(col), session_id: sessionId, delta: true, version: currentState.version })
     })
     .then(res => res.json())
     .then(data => {
-        currentState = data;
+        applyStepResponse(data);
         renderBoard();
         updateStatus();
     });
 }
 
+// /api/step is called in delta mode: apply the changed cells, or take the full board when one is sent
+function applyStepResponse(data) {
+    if (data.board === undefined) {
+        for (const [r, c, value] of data.changes) {
+            currentState.board[r][c] = value;
+        }
+        data.board = currentState.board;
+        delete data.changes;
+    }
+    currentState = data;
+}
+
 function updateStatus() {
     const statusDiv = document.getElementById("game-status");
     if (currentState.game_over) {
@@ -146,37 +160,45 @@ function updateStatus() {
     }
 }
 
-function playAgent() {
+async function playAgent() {
     const selectedAgent = document.getElementById("agent-select").value;
     const config = getBoardConfig();
     currentCustomMask = config.custom_mask; // Store the mask for agent games too
 
-    fetch("/api/play_agent", {
+    // Frames are streamed one JSON object per line as the agent plays
+    const response = await fetch("/api/play_agent", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ agent: selectedAgent, ...config })
-    })
-    .then(res => res.json())
-    .then(data => {
-        let frames = data.frames;
-        let finalState = data.final;
-
-        let i = 0;
-        function nextFrame() {
-            if (i < frames.length) {
-                currentState = frames[i].state;
-                renderBoard();
-                updateStatus();
-                i++;
-                setTimeout(nextFrame, 300); // delay between moves
+        body: JSON.stringify({ agent: selectedAgent, session_id: sessionId, stream: true, ...config })
+    });
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = "";
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split("\n");
+        buffered = lines.pop(); // keep any partial line for the next chunk
+
+        for (const line of lines) {
+            if (!line) continue;
+            const message = JSON.parse(line);
+            if (message.error) return;
+            if (message.final) {
+                sessionId = message.session_id;
+                currentState = message.final;
             } else {
-                currentState = finalState;
-                renderBoard();
-                updateStatus();
+                currentState = message.state;
+            }
+            renderBoard();
+            updateStatus();
+            if (!message.final) {
+                await new Promise(resolve => setTimeout(resolve, 300)); // delay between moves
             }
         }
-        nextFrame();
-    });
+    }
 }
 
 function handleReveal(event) {
@@ -193,11 +215,11 @@ function handleReveal(event) {
     fetch("/api/step", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ action, row, col })
+        body: JSON.stringify({ action, row, col, session_id: sessionId, delta: true, version: currentState.version })
     })
     .then(res => res.json())
     .then(data => {
-        currentState = data;
+        applyStepResponse(data);
         renderBoard();
         updateStatus();
     });
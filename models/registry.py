@@ -0,0 +1,96 @@
+# models/registry.py
+
+import importlib
+import os
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator, Type, Union
+
+MODELS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def discover_agents(models_dir: str = MODELS_DIR, package: str = "models") -> Dict[str, str]:
+    """
+    Find every models/<folder>/agent.py without importing it. Returns agent names
+    mapped to module paths; a folder named "<name>_agent" is listed as "<name>".
+    """
+    agents = {}
+    for entry in sorted(os.scandir(models_dir), key=lambda entry: entry.name):
+        if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "agent.py")):
+            name = entry.name[:-len("_agent")] if entry.name.endswith("_agent") else entry.name
+            agents[name] = f"{package}.{entry.name}.agent"
+    return agents
+
+
+class AgentRegistry(Mapping):
+    """
+    Read-only mapping of agent names to agent classes that imports an agent's
+    module only when it is first looked up, so listing agents or starting a
+    worker does not pay for every model's dependencies.
+
+    Entries are module paths ("models.x.agent", whose single BaseAgent subclass
+    is used) or "module:ClassName" strings; register() also accepts classes.
+    """
+
+    def __init__(self, agents: Dict[str, Union[str, type]] = None):
+        self._targets = discover_agents() if agents is None else dict(agents)
+        self._classes = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, target: Union[str, type]):
+        with self._lock:
+            self._targets[name] = target
+            self._classes.pop(name, None)
+
+    def __getitem__(self, name: str) -> Type:
+        cls = self._classes.get(name)
+        if cls is None:
+            target = self._targets[name]
+            cls = target if isinstance(target, type) else _load_agent_class(target)
+            with self._lock:
+                self._classes[name] = cls
+        return cls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._targets)
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def __contains__(self, name) -> bool:
+        # Membership must not import the agent, unlike Mapping's default
+        return name in self._targets
+
+
+def _load_agent_class(target: str) -> Type:
+    from models.base_agent import BaseAgent
+
+    module_name, _, class_name = target.partition(":")
+    module = importlib.import_module(module_name)
+    if class_name:
+        return getattr(module, class_name)
+
+    classes = [obj for obj in vars(module).values()
+               if isinstance(obj, type) and issubclass(obj, BaseAgent) and obj is not BaseAgent
+               and obj.__module__ == module.__name__]
+    if len(classes) != 1:
+        raise ImportError(f"Expected one BaseAgent subclass in {module_name}, found {len(classes)}")
+    return classes[0]
+
+
+AGENT_REGISTRY = AgentRegistry()
+
+
+def get_agent(name: str) -> Type:
+    """
+    Return the agent class registered under `name`, importing it on first use.
+    """
+    return AGENT_REGISTRY[name]
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("Available agents:", ", ".join(AGENT_REGISTRY))
+    print("Imported so far:", [name for name, module in AGENT_REGISTRY._targets.items() if module in sys.modules])
+    print("random ->", get_agent("random"))
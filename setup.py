@@ -9,6 +9,9 @@ setup(
         "pyyaml",
         "numpy"
     ],
+    extras_require={
+        "asgi": ["uvicorn", "a2wsgi"]
+    },
     entry_points={
         "console_scripts": [
             "minesweeper-ui=frontend.app:main"
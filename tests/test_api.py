@@ -0,0 +1,265 @@
+# tests/test_api.py
+
+import asyncio
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from backend import metrics
+from backend.game import GameSession
+from frontend.app import app
+from frontend.sessions import SessionStore
+from models.registry import AgentRegistry
+
+class TestGameAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def new_game(self, **config):
+        return self.client.post("/api/new_game", json={"width": 5, "height": 5, "num_mines": 3, **config}).get_json()
+
+    def test_sessions_are_independent(self):
+        first = self.new_game()
+        second = self.new_game()
+        self.assertNotEqual(first["session_id"], second["session_id"])
+
+        self.client.post("/api/step", json={"action": "flag", "row": 0, "col": 0, "session_id": first["session_id"]})
+        first_state = self.client.get("/api/state", query_string={"session_id": first["session_id"]}).get_json()
+        second_state = self.client.get("/api/state", query_string={"session_id": second["session_id"]}).get_json()
+        self.assertEqual(first_state["board"][0][0], "F")
+        self.assertIsNone(second_state["board"][0][0])
+
+    def test_unknown_session(self):
+        response = self.client.post("/api/step", json={"action": "reveal", "row": 0, "col": 0, "session_id": "missing"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_play_agent_stream_matches_frames(self):
+        session_id = self.new_game()["session_id"]
+        response = self.client.post("/api/play_agent", json={"agent": "random", "session_id": session_id, "stream": True})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        messages = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        final = messages[-1]
+        self.assertEqual(final["session_id"], session_id)
+        self.assertTrue(final["final"]["game_over"])
+        self.assertEqual(messages[-2]["state"], final["final"])
+        self.assertEqual(len(messages) - 1, final["final"]["moves_made"])
+
+    def test_step_waits_for_streamed_play_agent(self):
+        session_id = self.new_game()["session_id"]
+        # New dimensions, so the session gets a new game while the stream holds its lock
+        response = self.client.post("/api/play_agent", json={"agent": "random", "session_id": session_id, "stream": True,
+                                                             "width": 16, "height": 16, "num_mines": 40},
+                                    buffered=False)
+        chunks = response.iter_encoded()
+        lines = [next(chunks)]
+
+        results = []
+        step = threading.Thread(target=lambda: results.append(app.test_client().post(
+            "/api/step", json={"action": "flag", "row": 0, "col": 0, "session_id": session_id}).get_json()))
+        step.start()
+        step.join(0.2)
+        self.assertTrue(step.is_alive())
+
+        lines.extend(chunks)
+        response.close()
+        step.join()
+        messages = [json.loads(line) for line in b"".join(lines).decode().splitlines()]
+        moves = [message["state"]["moves_made"] for message in messages[:-1]]
+        self.assertEqual(moves, list(range(1, len(moves) + 1)))
+        self.assertEqual(len(results[0]["board"][0]), 16)
+        self.assertEqual(results[0]["moves_made"], messages[-1]["final"]["moves_made"])
+
+    def test_delta_steps_rebuild_the_full_board(self):
+        state = self.client.post("/api/new_game", json={"width": 16, "height": 16, "num_mines": 10}).get_json()
+        board = state["board"]
+        for row, col in [(0, 0), (8, 8), (15, 15), (3, 12), (12, 3)]:
+            for action in ("flag", "flag", "reveal"):
+                delta = self.client.post("/api/step", json={"action": action, "row": row, "col": col, "delta": True,
+                                                            "session_id": state["session_id"], "version": state["version"]}).get_json()
+                self.assertEqual(delta["version"], state["version"] + 1)
+                if "board" in delta:
+                    board = delta["board"]
+                else:
+                    for r, c, value in delta["changes"]:
+                        board[r][c] = value
+                state = self.client.get("/api/state", query_string={"session_id": state["session_id"]}).get_json()
+                self.assertEqual(board, state["board"])
+            if state["game_over"]:
+                break
+
+    def test_stale_version_gets_full_board(self):
+        state = self.new_game()
+        delta = self.client.post("/api/step", json={"action": "flag", "row": 0, "col": 0, "delta": True,
+                                                    "session_id": state["session_id"], "version": state["version"] - 1}).get_json()
+        self.assertIn("board", delta)
+
+    def test_batch_step_stops_at_game_over(self):
+        first = self.client.post("/api/new_game", json={"width": 4, "height": 4, "num_mines": 0}).get_json()
+        second = self.new_game()
+        actions = [
+            {"action": "flag", "row": 0, "col": 0, "session_id": second["session_id"]},
+            {"action": "reveal", "row": 3, "col": 3},
+            {"action": "reveal", "row": 0, "col": 0},
+        ]
+        response = self.client.post("/api/batch_step", json={"session_id": first["session_id"], "actions": actions})
+        results = response.get_json()["results"]
+        self.assertEqual(results[0]["changes"], [[0, 0, "F"]])
+        self.assertTrue(results[1]["won"])
+        self.assertTrue(results[2]["skipped"])
+
+    def test_batch_step_rejects_invalid_actions(self):
+        response = self.client.post("/api/batch_step", json={"actions": [{"action": "dig", "row": 0, "col": 0}]})
+        self.assertEqual(response.status_code, 400)
+
+    def enable_metrics(self):
+        metrics.reset()
+        metrics.enable()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.disable)
+
+    def test_metrics_are_recorded_when_enabled(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        session_id = self.new_game()["session_id"]
+        self.client.post("/api/step", json={"action": "flag", "row": 0, "col": 0, "session_id": session_id})
+        self.assertEqual(metrics.snapshot()["metrics"]["minesweeper_game_steps_total"]["samples"], [])
+
+        self.enable_metrics()
+        session_id = self.new_game(width=10, height=10, num_mines=0)["session_id"]
+        self.client.post("/api/step", json={"action": "reveal", "row": 0, "col": 0, "session_id": session_id})
+        metrics.disable()
+
+        snapshot = metrics.snapshot()["metrics"]
+        self.assertEqual(snapshot["minesweeper_game_steps_total"]["samples"][0]["value"], 1)
+        self.assertEqual(snapshot["minesweeper_revealed_cells_total"]["samples"][0]["value"], 100)
+        routes = {sample["labels"]["route"] for sample in snapshot["minesweeper_http_requests_total"]["samples"]}
+        self.assertEqual(routes, {"/api/new_game", "/api/step"})
+
+        text = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn('minesweeper_http_requests_total{route="/api/step",method="POST",status="200"} 1', text)
+        self.assertIn('minesweeper_flood_fill_cells_bucket{le="+Inf"} 1', text)
+
+    def test_streamed_request_latency_covers_the_whole_stream(self):
+        session_id = self.new_game()["session_id"]
+        self.enable_metrics()
+        response = self.client.post("/api/play_agent", json={"agent": "random", "session_id": session_id, "stream": True},
+                                    buffered=False)
+        chunks = response.iter_encoded()
+        next(chunks)
+        self.assertNotIn("/api/play_agent", self.client.get("/metrics").get_data(as_text=True))
+
+        time.sleep(0.1)
+        list(chunks)
+        response.close()
+        samples = metrics.snapshot()["metrics"]["minesweeper_http_request_seconds"]["samples"]
+        latency = next(sample for sample in samples if sample["labels"]["route"] == "/api/play_agent")
+        self.assertGreaterEqual(latency["sum"], 0.1)
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def test_lru_eviction_spills_to_disk(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = SessionStore(max_sessions=2, spill_dir=spill_dir)
+            ids = [store.create(GameSession(4, 4, 2)) for _ in range(3)]
+            self.assertEqual(len(store), 2)
+            with store.acquire(ids[0]) as game:
+                game.step("flag", 1, 1)
+            with store.acquire(ids[0]) as game:
+                self.assertTrue(game.board.is_flagged(1, 1))
+
+    def test_eviction_without_spill_dir_drops_sessions(self):
+        store = SessionStore(max_sessions=1)
+        first = store.create(GameSession(4, 4, 2))
+        store.create(GameSession(4, 4, 2))
+        self.assertNotIn(first, store)
+
+    def test_eviction_skips_sessions_in_use(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = SessionStore(max_sessions=2, spill_dir=spill_dir)
+            first, second = store.create(GameSession(4, 4, 2)), store.create(GameSession(4, 4, 2))
+            # Held as by a request that is still running, while staying least recently used
+            with store._sessions[first].lock:
+                third = store.create(GameSession(4, 4, 2))
+            self.assertEqual(list(store._sessions), [first, third])
+            self.assertIn(second, store)
+            with store.acquire(second) as game:
+                self.assertEqual(game.width, 4)
+            self.assertEqual(len(store), 2)
+
+    def test_session_in_use_is_not_evicted_by_its_own_lookup(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            store = SessionStore(max_sessions=2, spill_dir=spill_dir)
+            first, second, third = (store.create(GameSession(4, 4, 2)) for _ in range(3))
+            self.assertFalse(first in store._sessions)
+            # Every other session is held by a running request, so none of them can make room
+            with store._sessions[second].lock, store._sessions[third].lock:
+                with store.acquire(first) as game:
+                    game.step("flag", 1, 1)
+                self.assertEqual(list(store._sessions), [second, third, first])
+            with store.acquire(first) as game:
+                self.assertTrue(game.board.is_flagged(1, 1))
+            self.assertNotIn("missing", store)
+            with self.assertRaises(KeyError):
+                with store.acquire("missing"):
+                    pass
+            self.assertEqual(len(store), 2)
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_agents_and_pygame_are_imported_lazily(self):
+        registry = AgentRegistry()
+        self.assertIn("random", registry)
+        self.assertEqual(registry["random"].__name__, "RandomAgent")
+        self.assertIsNone(registry.get("missing"))
+
+        code = ("import sys, environment, frontend.app; "
+                "print('pygame' in sys.modules, 'models.random_agent.agent' in sys.modules)")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.split(), ["False", "False"])
+
+@unittest.skipUnless(importlib.util.find_spec("a2wsgi"), "needs the asgi extra")
+class TestASGIApp(unittest.TestCase):
+
+    def request(self, method, path, body=None):
+        """
+        Send one HTTP request through frontend.asgi.asgi_app and return (status, JSON body).
+        """
+        from frontend.asgi import asgi_app
+
+        payload = json.dumps(body).encode() if body is not None else b""
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+                 "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+                 "headers": [(b"host", b"testserver"), (b"content-type", b"application/json"),
+                             (b"content-length", str(len(payload)).encode())],
+                 "client": ("127.0.0.1", 1234), "server": ("testserver", 80)}
+        messages = [{"type": "http.request", "body": payload, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(asgi_app(scope, receive, send))
+        status = next(message["status"] for message in sent if message["type"] == "http.response.start")
+        content = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+        return status, json.loads(content)
+
+    def test_game_is_played_through_asgi(self):
+        status, game = self.request("POST", "/api/new_game", {"width": 5, "height": 5, "num_mines": 3})
+        self.assertEqual(status, 200)
+        status, state = self.request("POST", "/api/step", {"action": "flag", "row": 0, "col": 0,
+                                                           "session_id": game["session_id"]})
+        self.assertEqual(status, 200)
+        self.assertEqual(state["board"][0][0], "F")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+# tests/test_benchmarks.py
+
+import unittest
+
+from benchmarks.suite import BENCHMARKS, compare_results, run_benchmarks
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_every_benchmark_runs(self):
+        current = run_benchmarks(configs=["easy"], min_time=0.001, repeats=3, verbose=False)
+        self.assertEqual(set(current["results"]), {f"{name}[easy]" for name in BENCHMARKS})
+        for result in current["results"].values():
+            self.assertGreater(result["value"], 0)
+            self.assertGreaterEqual(result["samples"], 3)
+            self.assertEqual(len(result["values"]), 3)
+            self.assertEqual(result["value"], sorted(result["values"])[1])
+
+    def test_regressions_follow_metric_direction(self):
+        def results(**values):
+            return {"meta": {}, "results": {key: {"value": value, "higher_is_better": not key.startswith("api"),
+                                                  "samples": 2 if key == "huge" else 50}
+                                            for key, value in values.items()}}
+
+        baseline = results(steps=100.0, api=1.0, flood=50.0, huge=10.0)
+        current = results(steps=70.0, api=0.5, flood=55.0, reset=10.0, huge=1.0)
+        statuses = {row["benchmark"]: row["status"] for row in compare_results(current, baseline, tolerance=0.2)}
+        self.assertEqual(statuses, {"steps": "regression", "api": "improvement", "flood": "ok", "reset": "new",
+                                    "huge": "too few samples"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,21 @@
 # tests/test_board.py
 
+import itertools
+import os
+import pickle
+import random
+import tempfile
+import time
 import unittest
+
+import numpy as np
 from backend.board import MinesweeperBoard
+from backend.board_bank import BoardBank, generate_board_bank
+from backend.game import GameSession
+from backend.neighbors import get_neighbor_index
+from backend.probability import MineProbabilityEngine
+from backend.sampling import SampledProbabilityEstimator
+from backend.solver import LogicalSolver
 
 class TestMinesweeperBoard(unittest.TestCase):
 
@@ -21,5 +35,162 @@ class TestMinesweeperBoard(unittest.TestCase):
         self.assertFalse(hit_mine)
         self.assertTrue(board.revealed[0][0])
 
+    def test_adjacent_counts_match_custom_mask(self):
+        mask = [(-2, 0), (0, 1), (1, 1), (2, -2)]
+        board = MinesweeperBoard(width=9, height=7, num_mines=15, seed=3, custom_mask=mask)
+        for r in range(board.height):
+            for c in range(board.width):
+                if board.is_mine(r, c):
+                    continue
+                expected = sum(1 for dr, dc in mask if board.is_mine(r + dr, c + dc))
+                self.assertEqual(board.board[r][c], expected)
+
+    def test_seeded_layout_is_reproducible(self):
+        a = MinesweeperBoard(width=16, height=16, num_mines=40, seed=7)
+        b = MinesweeperBoard(width=16, height=16, num_mines=40, seed=7)
+        self.assertEqual(a.board.tolist(), b.board.tolist())
+
+    def test_flood_fill_large_empty_board(self):
+        board = MinesweeperBoard(width=300, height=300, num_mines=0)
+        self.assertFalse(board.reveal(150, 150))
+        self.assertEqual(len(board.last_revealed), 300 * 300)
+        self.assertTrue(board.is_complete())
+
+    def test_chord_reveals_unflagged_neighbors(self):
+        board = MinesweeperBoard(width=3, height=3, num_mines=0)
+        board.board[:] = 1
+        board.board[0][0] = -1
+        board.reveal(1, 1)
+        board.flag(0, 0)
+        opened = board.reveal_cells(1, 1)
+        self.assertEqual(len(opened), 7)
+        self.assertFalse(board.is_revealed(0, 0))
+
+    def test_neighbor_index_matches_mask(self):
+        mask = [(-2, 0), (0, 1), (1, 1)]
+        index = get_neighbor_index(5, 4, mask)
+        for i in range(20):
+            row, col = divmod(i, 5)
+            expected = [(row + dr) * 5 + col + dc for dr, dc in mask
+                        if 0 <= row + dr < 4 and 0 <= col + dc < 5]
+            self.assertEqual(index.lists[i], expected)
+            self.assertEqual(sorted(index.reverse_lists[i]), sorted(j for j in range(20) if i in index.lists[j]))
+        board = MinesweeperBoard(width=5, height=4, num_mines=3, custom_mask=mask)
+        self.assertIs(board.neighbor_index, index)
+        self.assertIs(pickle.loads(pickle.dumps(board)).neighbor_index, index)
+
+    def test_counters_track_grid(self):
+        rng = random.Random(0)
+        board = MinesweeperBoard(width=12, height=10, num_mines=20, seed=11)
+        for _ in range(200):
+            r, c = rng.randrange(board.height), rng.randrange(board.width)
+            if rng.random() < 0.3:
+                board.flag(r, c)
+            elif not board.is_mine(r, c):
+                board.reveal(r, c)
+            mines = board.board == -1
+            self.assertEqual(board.revealed_count, int(board.revealed.sum()))
+            self.assertEqual(board.safe_revealed, int((board.revealed & ~mines).sum()))
+            self.assertEqual(board.num_flags, int(board.flags.sum()))
+            self.assertEqual(board.correct_flags, int((board.flags & mines).sum()))
+            self.assertEqual(board.incorrect_flags, int((board.flags & ~mines).sum()))
+            self.assertEqual(board.is_complete(), bool(np.all(board.revealed | mines)))
+
+    def test_board_bank_boards_are_consistent(self):
+        with tempfile.TemporaryDirectory() as bank_dir:
+            path = os.path.join(bank_dir, "bank.npy")
+            generate_board_bank(path, width=9, height=6, num_mines=12, count=50, seed=0, chunk_size=16)
+            bank = BoardBank(path)
+            self.assertEqual(len(bank), 50)
+
+            game = GameSession(width=9, height=6, num_mines=12, board_bank=bank)
+            for index in (0, 17, 49):
+                game.reset(bank_index=index)
+                layout = game.board.get_mine_layout()
+                self.assertEqual(len(layout), 12)
+                rebuilt = MinesweeperBoard(width=9, height=6, num_mines=12, mine_layout=layout)
+                self.assertEqual(game.board.board.tolist(), rebuilt.board.tolist())
+
+    def test_no_guess_board_is_won_by_deduction(self):
+        for seed in range(5):
+            game = GameSession(width=16, height=16, num_mines=40, seed=seed, no_guess=True)
+            solver = LogicalSolver(16, 16, num_mines=40)
+            to_reveal = [game.safe_start]
+            while to_reveal:
+                for r, c in to_reveal:
+                    game.step("reveal", r, c)
+                    for nr, nc in game.board.last_revealed:
+                        solver.reveal(nr, nc, int(game.board.board[nr, nc]))
+                to_reveal, mines = solver.solve()
+                for r, c in mines:
+                    self.assertEqual(game.board.board[r, c], -1)
+            self.assertTrue(game.is_win())
+
+    def test_mine_probabilities_match_brute_force(self):
+        custom_mask = [(-1, 0), (1, 0), (0, -1), (0, 1), (-2, 0), (0, 2)]
+        for mask in (None, custom_mask):
+            game = GameSession(width=5, height=4, num_mines=5, seed=26, custom_mask=mask)
+            engine = MineProbabilityEngine(5, 4, 5, custom_mask=mask)
+            game.step("reveal", 0, 0)
+            game.step("reveal", 3, 4)
+            state = game.get_state()["board"]
+            self.assertFalse(game.is_game_over())
+
+            # Average over every layout consistent with the revealed numbers
+            totals, layouts = np.zeros(20), 0
+            for mines in itertools.combinations(range(20), 5):
+                board = MinesweeperBoard(5, 4, 5, custom_mask=mask, mine_layout=list(mines))
+                if all(board.board[r, c] == v for r, row in enumerate(state) for c, v in enumerate(row)
+                       if isinstance(v, int)):
+                    totals[list(mines)] += 1
+                    layouts += 1
+            expected = (totals / layouts).reshape(4, 5)
+            np.testing.assert_allclose(engine.compute(state), expected)
+
+    def test_sampled_probabilities_approach_exact(self):
+        game = GameSession(width=30, height=16, num_mines=99, seed=2)
+        for r, c in [(8, 15), (3, 4), (12, 25), (2, 27)]:
+            if game.board.board[r, c] != -1:
+                game.step("reveal", r, c)
+        state = game.get_state()["board"]
+        exact = MineProbabilityEngine(30, 16, 99).compute(state)
+
+        estimator = SampledProbabilityEstimator(30, 16, 99, exact_nodes=0, seed=0)
+        estimate = estimator.estimate(state, num_samples=5000)
+        self.assertGreaterEqual(estimator.last_num_samples, 5000)
+        np.testing.assert_allclose(estimate, exact, atol=0.1)
+
+        # Warm-started from the previous call's chains after another move
+        game.step("reveal", *np.argwhere(exact == exact[exact > 0].min())[0].tolist())
+        state = game.get_state()["board"]
+        exact = MineProbabilityEngine(30, 16, 99).compute(state)
+        np.testing.assert_allclose(estimator.estimate(state, num_samples=5000), exact, atol=0.1)
+
+    def test_sampled_probabilities_error_within_budget(self):
+        game = GameSession(width=30, height=16, num_mines=99, seed=2)
+        for r, c in [(8, 15), (3, 4), (12, 25), (2, 27)]:
+            if game.board.board[r, c] != -1:
+                game.step("reveal", r, c)
+        state = game.get_state()["board"]
+        exact = MineProbabilityEngine(30, 16, 99).compute(state)
+
+        # Every component is small enough to count, so the estimate is exact well within the budget
+        estimator = SampledProbabilityEstimator(30, 16, 99, seed=0)
+        start = time.perf_counter()
+        np.testing.assert_allclose(estimator.estimate(state, time_budget=0.05), exact, atol=1e-9)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        # Sampling alone gets within about 0.05 in a second
+        estimator = SampledProbabilityEstimator(30, 16, 99, exact_nodes=0, seed=0)
+        np.testing.assert_allclose(estimator.estimate(state, time_budget=1.0), exact, atol=0.2)
+
+    def test_sampled_probabilities_reject_inconsistent_boards(self):
+        estimator = SampledProbabilityEstimator(3, 3, 2, seed=0)
+        with self.assertRaises(ValueError):
+            estimator.estimate([[None, None, None], [None, None, None], [None, None, 4]])
+        # Each number fits on its own, but the "2" needs the cell the "0" keeps clear
+        with self.assertRaises(ValueError):
+            SampledProbabilityEstimator(5, 1, 2, seed=0).estimate([[None, 2, None, 0, None]])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,138 @@
+# tests/test_env.py
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+from environment.minesweeper_env import MinesweeperEnv
+from environment.minesweeper_vector_env import MinesweeperVectorEnv
+from environment.rendering import FrameWriter
+from environment.shared_memory_vector_env import SharedMemoryVectorEnv
+
+VISIBLE_CODES = {None: -3, "F": -2, "*": -1, "M": -1, "X": -4}
+VISIBLE_SPRITES = {None: "cellup", "F": "cellflag", "*": "blast", "M": "cellmine", "X": "falsemine"}
+
+
+def encode_visible_state(board):
+    return np.array([[VISIBLE_CODES.get(cell, cell) for cell in row] for row in board])
+
+
+class TestMinesweeperEnv(unittest.TestCase):
+
+    def test_encoded_board_matches_visible_state(self):
+        env = MinesweeperEnv(board_size=(9, 7), num_mines=8)
+        env.action_space.seed(0)
+        for _ in range(20):
+            obs, _ = env.reset()
+            terminated = False
+            while not terminated:
+                expected = encode_visible_state(env.game.get_state()["board"])
+                np.testing.assert_array_equal(obs["board"], expected)
+                obs, _, terminated, _, _ = env.step(env.action_space.sample())
+            expected = encode_visible_state(env.game.get_state()["board"])
+            np.testing.assert_array_equal(obs["board"], expected)
+
+    def test_dirty_rendering_matches_full_redraw(self):
+        import pygame
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, "frames.npy")
+            env = MinesweeperEnv(board_size=(6, 5), num_mines=5, render_mode="human", fps=0, frames_dir=target)
+            rgb_env = MinesweeperEnv(board_size=(6, 5), num_mines=5, render_mode="rgb_array")
+            env.action_space.seed(1)
+            env.reset(seed=1)
+            rgb_env.reset(seed=1)
+            frames, terminated = 1, False
+            while not terminated:
+                action = env.action_space.sample()
+                _, _, terminated, _, _ = env.step(action)
+                rgb_env.step(action)
+                frames += 1
+                full = pygame.Surface(env.screen.get_size())
+                for r, row in enumerate(env.game.get_state()["board"]):
+                    for c, cell in enumerate(row):
+                        name = f"cell{cell}" if isinstance(cell, int) else VISIBLE_SPRITES[cell]
+                        full.blit(env.sprites[name], (c * 40, r * 40))
+                np.testing.assert_array_equal(pygame.surfarray.array3d(env.screen), pygame.surfarray.array3d(full))
+                np.testing.assert_array_equal(rgb_env.render(), pygame.surfarray.array3d(full).transpose(1, 0, 2))
+            last = pygame.surfarray.array3d(env.screen).transpose(1, 0, 2)
+            env.close()
+            recorded = np.load(target)
+            self.assertEqual(recorded.shape, (frames, 5 * 40, 6 * 40, 3))
+            np.testing.assert_array_equal(recorded[-1], last)
+
+    def test_vector_env_matches_single_env(self):
+        num_envs = 16
+        envs = [MinesweeperEnv(board_size=(7, 5), num_mines=6, seed=i, render_mode="rgb_array", cell_size=8)
+                for i in range(num_envs)]
+        vec_env = MinesweeperVectorEnv(num_envs=num_envs, board_size=(7, 5), num_mines=6, seed=0,
+                                       render_mode="rgb_array", cell_size=8)
+        vec_env.reset()
+        for i, env in enumerate(envs):
+            env.reset()
+            vec_env.mines[i] = env.game.board.board == -1
+            vec_env.counts[i] = env.game.board.board
+
+        rng = np.random.default_rng(0)
+        done = np.zeros(num_envs, dtype=bool)
+        while not done.all():
+            actions = np.stack([env.action_space.sample() for env in envs])
+            actions[:, 2] = rng.random(num_envs) < 0.2
+            vec_obs, vec_rewards, vec_terminated, _, _ = vec_env.step(actions)
+            vec_frames = vec_env.render()
+            for i, env in enumerate(envs):
+                if done[i]:
+                    continue
+                obs, reward, terminated, _, _ = env.step(actions[i])
+                np.testing.assert_array_equal(vec_obs["board"][i], obs["board"])
+                self.assertEqual(vec_obs["game_over"][i], obs["game_over"])
+                self.assertAlmostEqual(vec_rewards[i], reward)
+                self.assertEqual(vec_terminated[i], terminated)
+                np.testing.assert_array_equal(vec_frames[i], env.render())
+                done[i] = terminated
+
+    def test_shared_memory_env_is_independent_of_worker_count(self):
+        actions = np.random.default_rng(0).integers(0, [6, 6, 2], size=(10, 4, 3))
+        results = []
+        for num_workers in (1, 2):
+            envs = SharedMemoryVectorEnv(num_envs=4, num_workers=num_workers)
+            obs, _ = envs.reset(seed=123)
+            boards, rewards = [obs["board"]], []
+            for step_actions in actions:
+                obs, reward, _, _, _ = envs.step(step_actions)
+                boards.append(obs["board"])
+                rewards.append(reward)
+            envs.close()
+            results.append((np.stack(boards), np.stack(rewards)))
+        np.testing.assert_array_equal(results[0][0], results[1][0])
+        np.testing.assert_array_equal(results[0][1], results[1][1])
+
+    def test_frame_writer_reports_failures_without_blocking(self):
+        import pygame
+
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = FrameWriter(os.path.join(tmp, "frames"), max_pending=1)
+            shutil.rmtree(os.path.join(tmp, "frames"))
+            surface = pygame.Surface((8, 8))
+            with self.assertRaises(RuntimeError):
+                for i in range(100):
+                    writer.write(surface, f"frame_{i}.png")
+            with self.assertRaises(RuntimeError):
+                writer.close()
+            writer.close()
+
+    def test_frame_writer_flushes_at_exit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, "frames.npy")
+            code = ("import sys, pygame; from environment.rendering import FrameWriter; "
+                    "writer = FrameWriter(sys.argv[1]); "
+                    "[writer.write(pygame.Surface((4, 3)), '') for _ in range(50)]")
+            subprocess.run([sys.executable, "-c", code, target], check=True, capture_output=True)
+            self.assertEqual(np.load(target, mmap_mode="r").shape, (50, 3, 4, 3))
+
+if __name__ == "__main__":
+    unittest.main()
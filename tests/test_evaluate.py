@@ -0,0 +1,71 @@
+# tests/test_evaluate.py
+
+import os
+import random
+import tempfile
+import unittest
+
+from backend.game import GameSession
+from evaluation.evaluate import evaluate_agent
+from evaluation.leaderboard import LeaderboardStore, summarize_agent_logs
+from evaluation.replay import ReplayEngine, record_episode
+from evaluation.replay_io import ReplayWriter, iter_replays
+from models.random_agent.agent import RandomAgent
+
+class TestEvaluateAgent(unittest.TestCase):
+
+    def test_seeded_results_do_not_depend_on_worker_count(self):
+        serial = evaluate_agent(RandomAgent, num_episodes=20, width=8, height=8, num_mines=10, seed=1)
+        parallel = evaluate_agent(RandomAgent, num_episodes=20, width=8, height=8, num_mines=10, seed=1, num_workers=2)
+        self.assertEqual(serial, parallel)
+
+    def test_seeded_evaluation_keeps_callers_random_state(self):
+        random.seed(123)
+        expected = random.random()
+        random.seed(123)
+        evaluate_agent(RandomAgent, num_episodes=3, width=8, height=8, num_mines=10, seed=1)
+        self.assertEqual(random.random(), expected)
+
+    def test_replay_engine_rebuilds_every_step(self):
+        game = GameSession(width=9, height=9, num_mines=10, seed=4)
+        agent = RandomAgent(config={"prefer_reveal": False})
+        states, actions = [], []
+        while not game.is_game_over() and len(actions) < 200:
+            states.append(game.get_state())
+            actions.append(agent.act(states[-1]))
+            game.step(*actions[-1])
+        states.append(game.get_state())
+
+        engine = ReplayEngine.from_record(record_episode(game, actions), keyframe_interval=2)
+        self.assertEqual(list(engine.iter_states()), states)
+        for step in range(len(states)):
+            self.assertEqual(engine.state_at(step), states[step])
+
+    def test_replay_file_round_trip(self):
+        episodes = [{"episode": 1, "mines": [[0, 1], [2, 2]], "actions": [["reveal", 0, 0]]},
+                    {"episode": 2, "mines": [], "actions": []}]
+        with tempfile.TemporaryDirectory() as save_dir:
+            path = os.path.join(save_dir, "replays.jsonl.gz")
+            with ReplayWriter(path) as writer:
+                for episode in episodes:
+                    writer.write(episode)
+            self.assertEqual(list(iter_replays(path)), episodes)
+
+            evaluate_agent(RandomAgent, num_episodes=3, width=8, height=8, num_mines=10, seed=1, save_dir=save_dir)
+            replay_file = next(name for name in os.listdir(save_dir) if name.startswith("replays_"))
+            replays = list(iter_replays(os.path.join(save_dir, replay_file)))
+            self.assertEqual([replay["episode"] for replay in replays], [1, 2, 3])
+
+    def test_leaderboard_store_matches_full_scan(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            for label in ("easy", "hard"):
+                evaluate_agent(RandomAgent, num_episodes=5, width=8, height=8, num_mines=10, seed=1,
+                               save_dir=os.path.join(log_dir, f"randomagent_{label}"))
+            store = LeaderboardStore(os.path.join(log_dir, "leaderboard.sqlite"))
+            self.assertEqual(store.ingest(log_dir), 2)
+            self.assertEqual(store.ingest(log_dir), 0)
+            self.assertEqual(store.leaderboard(), dict(summarize_agent_logs(log_dir)))
+            store.close()
+
+if __name__ == "__main__":
+    unittest.main()